@@ -0,0 +1,324 @@
+import argparse
+import io
+import json
+import logging
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+import calendarCore as cg
+
+BENCHMARK_YEAR = 2026
+SCALE_YEARS = range(2000, 2050)
+STYLESHEETS = {}
+
+
+def clear_fragment_caches():
+    for cache in cg.FragmentCache.registry.values():
+        cache.clear()
+
+
+def make_calendar(standard, year=BENCHMARK_YEAR, font_data=None):
+    photo_texts = cg.load_photo_texts(cg.PHOTO_TEXT_PATH)
+    if font_data is None:
+        font_data = cg.load_font_data_uri(
+            cg.FONT_PATH, cg.collect_font_characters(photo_texts)
+        )
+    return cg.build_calendar_context(
+        year, standard, STYLESHEETS, photo_texts, font_data
+    )
+
+
+def month_datas(calendar, month_index):
+    years = calendar["years"]
+    return (
+        cg.relative_month_data(years, month_index),
+        cg.relative_month_data(years, month_index - 1),
+        cg.relative_month_data(years, month_index + 1),
+    )
+
+
+def micro_benchmarks():
+    """
+    Benchmarks of each builder on its own, for the A3 standard.
+    """
+    calendar = make_calendar("A3")
+    layout = calendar["layout"]
+    previous_year, current_year, next_year = calendar["years"]
+    current, previous, following = month_datas(calendar, 2)
+    photo_texts = calendar["photo_texts"]
+    characters = cg.collect_font_characters(photo_texts)
+    description_advances = cg.get_glyph_advances(
+        cg.FONT_PATH, layout.description_font_size_mm
+    )
+
+    # A complete page, to measure serialization on its own.
+    page = cg.SvgwriteBackend()
+    page_size_in_mm = layout.page_size_mm
+    page.begin_document(
+        io.StringIO(), (f"{page_size_in_mm[0]}mm", f"{page_size_in_mm[1]}mm")
+    )
+    page.begin_defs()
+    page.style(cg.FONT_TEMPLATE.format(name=cg.FONT_NAME, data=calendar["font_data"]))
+    page.style(calendar["stylesheet"])
+    page.end_defs()
+    cg.add_page_content(page, calendar, 2, ("100%", "100%"))
+
+    def save_page():
+        page.fileobj = io.StringIO()
+        page.close()
+
+    return {
+        "micro.create_month_grid": lambda: cg.create_month_grid(
+            layout.day_size, current, previous, following
+        ),
+        "micro.create_single_minimonth": lambda: cg.create_single_minimonth(
+            layout.minimonth_size, "Marzo 2026", current, previous, following
+        ),
+        "micro.month_cells": lambda: cg.get_month_cells.__wrapped__(BENCHMARK_YEAR, 2),
+        "micro.create_minimonth_pair": lambda: (
+            clear_fragment_caches(),
+            cg.create_minimonth_pair(
+                layout.minimonth_size, 2, current_year, previous_year, next_year
+            ),
+        ),
+        "micro.wrap_descriptions": lambda: [
+            cg.wrap_text.__wrapped__(
+                description, layout.text_max_width, description_advances
+            )
+            for _, description in photo_texts
+        ],
+        "micro.font_embedding": lambda: cg.load_font_data_uri(cg.FONT_PATH, characters),
+        "micro.save": save_page,
+    }
+
+
+def render_year(calendar, backend, month_indexes=range(12)):
+    clear_fragment_caches()
+    for month_index in month_indexes:
+        cg.write_document(calendar, [month_index], io.StringIO(), backend)
+
+
+def macro_benchmarks():
+    """
+    Full 12-page years for every standard and backend, and A3 planners, starting from cold
+    fragment caches.
+    """
+    benchmarks = {}
+    for standard in sorted(cg.STANDARDS):
+        calendar = make_calendar(standard)
+        for backend in sorted(cg.BACKENDS):
+            benchmarks[f"macro.year.{standard}.{backend}"] = (
+                lambda calendar=calendar, backend=backend: render_year(
+                    calendar, backend
+                )
+            )
+    calendar = make_calendar("A3")
+    for mode in sorted(cg.PLANNER_MODES):
+        for backend in sorted(cg.BACKENDS):
+            benchmarks[f"macro.planner_{mode}.A3.{backend}"] = (
+                lambda mode=mode, backend=backend: render_planner(
+                    calendar, mode, backend
+                )
+            )
+    return benchmarks
+
+
+def render_planner(calendar, mode, backend):
+    clear_fragment_caches()
+    for number, first_day in enumerate(cg.PLANNER_MODES[mode](BENCHMARK_YEAR), 1):
+        cg.write_planner_page(calendar, mode, number, first_day, io.StringIO(), backend)
+
+
+def scale_benchmarks():
+    """
+    Many years rendered in a single process, with fragment caches shared across years.
+    """
+    font_data = make_calendar("A3")["font_data"]
+    calendars = [make_calendar("A3", year, font_data=font_data) for year in SCALE_YEARS]
+
+    def render_years(backend):
+        clear_fragment_caches()
+        for calendar in calendars:
+            for month_index in range(12):
+                cg.write_document(calendar, [month_index], io.StringIO(), backend)
+
+    return {
+        f"scale.{len(calendars)}_years.{backend}": (
+            lambda backend=backend: render_years(backend)
+        )
+        for backend in sorted(cg.BACKENDS)
+    }
+
+
+def startup_benchmarks():
+    """
+    Cold starts in a fresh interpreter, as in short per-customer runs: importing calendarCore,
+    importing it then rendering a first page with warm disk caches, and the command line
+    rendering a first page.
+    """
+    cwd = Path(cg.__file__).parent
+
+    def run(*args):
+        subprocess.run(
+            [sys.executable, *args], cwd=cwd, capture_output=True, check=True
+        )
+
+    benchmarks = {
+        "startup.interpreter": lambda: run("-c", "pass"),
+        "startup.import": lambda: run("-c", "import calendarCore"),
+    }
+    for backend in sorted(cg.BACKENDS):
+        code = f"import calendarCore as cg; cg.render_month({BENCHMARK_YEAR}, 1, backend={backend!r})"
+        benchmarks[f"startup.first_page.{backend}"] = lambda code=code: run("-c", code)
+        command = [
+            "calendarGen.py",
+            "--months",
+            "1",
+            "--backend",
+            backend,
+            "--sink",
+            "memory",
+            "--force",
+            "--log-file",
+            "none",
+            "--log-console",
+            "none",
+        ]
+        benchmarks[f"startup.cli.{backend}"] = lambda command=command: run(*command)
+    return benchmarks
+
+
+LEVELS = {
+    "micro": (micro_benchmarks, 5, 20),
+    "macro": (macro_benchmarks, 5, 1),
+    "scale": (scale_benchmarks, 3, 1),
+    "startup": (startup_benchmarks, 5, 1),
+}
+
+
+def run_benchmarks(levels, name_filter=None):
+    """
+    Run the benchmarks of the given levels.
+
+    :return: Dictionary of benchmark name -> timings in seconds per call.
+    """
+    results = {}
+    for level in levels:
+        factory, repeat, number = LEVELS[level]
+        for name, func in factory().items():
+            if name_filter and name_filter not in name:
+                continue
+            func()  # Warm up imports and module level caches.
+            timings = [
+                elapsed / number
+                for elapsed in timeit.Timer(func).repeat(repeat=repeat, number=number)
+            ]
+            timings.sort()
+            results[name] = {
+                "min": timings[0],
+                "median": timings[len(timings) // 2],
+                "repeat": repeat,
+                "number": number,
+            }
+            print(
+                f"{name:45} min {timings[0] * 1000:10.3f} ms   median {timings[len(timings) // 2] * 1000:10.3f} ms"
+            )
+    return results
+
+
+def compare(baseline, current, threshold, statistic="min"):
+    """
+    Compare two result files.
+
+    :param threshold: Relative slowdown above which a benchmark is a regression, e.g. 0.1.
+    :return: List of (name, baseline seconds, current seconds) regressions.
+    """
+    regressions = []
+    for name in sorted(current["results"]):
+        if name not in baseline["results"]:
+            print(f"{name:45} new")
+            continue
+        before = baseline["results"][name][statistic]
+        after = current["results"][name][statistic]
+        change = after / before - 1
+        flag = "REGRESSION" if change > threshold else ""
+        print(
+            f"{name:45} {before * 1000:10.3f} ms -> {after * 1000:10.3f} ms  {change:+7.1%} {flag}"
+        )
+        if change > threshold:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for calendarCore.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks.")
+    run_parser.add_argument(
+        "--level",
+        nargs="+",
+        choices=sorted(LEVELS),
+        default=["micro", "macro", "scale", "startup"],
+        help="Benchmark levels to run. Default: all.",
+    )
+    run_parser.add_argument(
+        "--filter", help="Only run benchmarks whose name contains this text."
+    )
+    run_parser.add_argument("--output", help="Write results as JSON to this file.")
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare results against a baseline."
+    )
+    compare_parser.add_argument("baseline", help="Baseline results JSON file.")
+    compare_parser.add_argument("current", help="Current results JSON file.")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown flagged as a regression. Default: 0.1 (10%%).",
+    )
+    compare_parser.add_argument(
+        "--statistic",
+        choices=["min", "median"],
+        default="min",
+        help="Statistic to compare. Default: min.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(message)s")
+
+    if args.command == "run":
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": run_benchmarks(args.level, args.filter),
+        }
+        if args.output:
+            with open(args.output, "w", encoding="utf8") as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    with open(args.baseline, "r", encoding="utf8") as file:
+        baseline = json.load(file)
+    with open(args.current, "r", encoding="utf8") as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, args.threshold, args.statistic)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
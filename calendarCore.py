@@ -0,0 +1,5330 @@
+import argparse
+from array import array
+import base64
+import csv
+import datetime
+import functools
+import gc
+import hashlib
+import importlib
+import io
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import signal
+import string
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import textwrap
+from collections import OrderedDict, deque
+from pathlib import Path
+
+# svgwrite, cssutils, the optional dependencies and the standard modules only some modes use
+# (process pools, archives, subprocesses, HTTP) are imported on first use, so short runs with
+# warm caches do not pay for them. Optional ones: fontTools (font subsetting and text
+# measuring), Pillow (photos) and cairosvg (--export renderer).
+
+
+@functools.lru_cache(maxsize=None)
+def optional_module(name):
+    """
+    Import an optional dependency on first use.
+
+    :return: The module, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+calendar_standard = "A3"  # Default standard, "488x330" or "A3"
+default_year = 2026
+# Pages also show the months of the previous and next year, which must exist too.
+MIN_YEAR = datetime.MINYEAR + 1
+MAX_YEAR = datetime.MAXYEAR - 1
+parameters_488x330 = {
+    "page_size_mm": (488, 330),
+    "month_relative_size": (0.95, 0.7),
+    "content_top_edge_mm": 20,
+    "content_bottom_edge_mm": 16,
+    "month_number_label_margin_mm": 0,
+    "month_labels_vertical_gap_mm": 2,
+    "summary_to_description_gap_mm": 2,
+    "center_offset_mm": 20,
+    "description_line_offset_mm": 5,
+    "photo_gap_mm": 3,
+    "minimonth_text_gap_mm": 4,
+}
+
+parameters_A3 = {
+    "page_size_mm": (297, 210),
+    "month_relative_size": (0.95, 0.7),
+    "content_top_edge_mm": 10,
+    "content_bottom_edge_mm": 12.5,
+    "month_number_label_margin_mm": 0,
+    "month_labels_vertical_gap_mm": 2,
+    "summary_to_description_gap_mm": 2,
+    "center_offset_mm": 10,
+    "description_line_offset_mm": 4,
+    "photo_gap_mm": 2,
+    "minimonth_text_gap_mm": 3,
+}
+
+STANDARDS = {
+    "488x330": parameters_488x330,
+    "A3": parameters_A3,
+}
+DEFAULT_STANDARDS_CONFIG = Path("standards.json")
+
+DEFAULT_HOLIDAY_REGION = "CL"
+HOLIDAYS_DIR = Path("holidays")
+
+PHOTO_TEXT_PATH = Path("TextoFotos.txt")
+DEFAULT_PHOTO_TEXT = (
+    "Lorem Ipsum",
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.",
+)
+
+FONT_NAME = "Creato Display"
+# Same @font-face rule and MIME types as svgwrite, without importing it.
+FONT_TEMPLATE = (
+    '@font-face{{ \n    font-family: "{name}"; \n    src: url("{data}"); \n}}\n'
+)
+FONT_MIMETYPES = {
+    ".ttf": "application/x-font-ttf",
+    ".otf": "application/x-font-opentype",
+    ".woff": "application/font-woff",
+    ".woff2": "application/font-woff2",
+}
+FONT_PATH = Path("fonts/CreatoDisplay-Regular.otf")
+DEFAULT_CACHE_DIR = Path(".calendar_cache")
+DEFAULT_PAGE_CACHE_SIZE_MB = 256
+DEFAULT_LOG_PATH = Path("debug.log")
+
+PHOTOS_DIR = Path("photos")
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+PHOTO_FORMATS = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+DEFAULT_PHOTO_DPI = 300
+# Photos whose frame is narrower or lower than this are left out of the page.
+DEFAULT_PHOTO_MIN_SIZE_MM = 20
+
+WEEKDAY_NAMES = [
+    "Lunes",
+    "Martes",
+    "Miércoles",
+    "Jueves",
+    "Viernes",
+    "Sábado",
+    "Domingo",
+]
+MINI_WEEKDAY_LETTERS = "LMMJVSD"
+
+
+class YearData:
+    @staticmethod
+    def month_names(index):
+        month_names = [
+            "Enero",
+            "Febrero",
+            "Marzo",
+            "Abril",
+            "Mayo",
+            "Junio",
+            "Julio",
+            "Agosto",
+            "Septiembre",
+            "Octubre",
+            "Noviembre",
+            "Diciembre",
+        ]
+        return month_names[index]
+
+    @staticmethod
+    def is_leap_year(year):
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+    @staticmethod
+    def month_lengths(year):
+        month_days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+        if YearData.is_leap_year(year):
+            month_days[1] = 29
+        return month_days
+
+    @staticmethod
+    def start_day_index(year):
+        """
+        Weekday of January 1st in the proleptic Gregorian calendar, from 0 (Monday) to 6 (Sunday).
+        """
+        previous = year - 1
+        # Gauss' algorithm gives 0 for Sunday, shift it so Monday is 0.
+        sunday_based = (
+            1 + 5 * (previous % 4) + 4 * (previous % 100) + 6 * (previous % 400)
+        ) % 7
+        return (sunday_based + 6) % 7
+
+    @staticmethod
+    def month_start_matrix(first_year, last_year):
+        """
+        Starting weekday of every month for a range of years, in one pass.
+
+        :param first_year: First year of the range.
+        :param last_year: Last year of the range, included.
+        :return: One list of 12 weekday indexes per year.
+        """
+        matrix = []
+        year_start = YearData.start_day_index(first_year)
+        for year in range(first_year, last_year + 1):
+            month_days = YearData.month_lengths(year)
+            month_starts = [year_start]
+            for i in range(1, 12):
+                month_starts.append((month_starts[i - 1] + month_days[i - 1]) % 7)
+            matrix.append(month_starts)
+            year_start = (month_starts[11] + month_days[11]) % 7
+        return matrix
+
+    def __init__(self, year, region=DEFAULT_HOLIDAY_REGION):
+        self.year = year
+        self.region = region
+        self.month_days = self.month_lengths(year)
+        self.year_day_start_index = self.start_day_index(year)
+        self.month_starting_day_indexes = [self.year_day_start_index]
+        for i in range(1, 12):
+            self.month_starting_day_indexes.append(
+                (self.month_starting_day_indexes[i - 1] + self.month_days[i - 1]) % 7
+            )
+        self.holidays = get_holiday_calendar(region).holidays(year)
+
+
+@functools.lru_cache(maxsize=256)
+def get_year_data(year, region=DEFAULT_HOLIDAY_REGION):
+    """
+    Get the YearData for a year, building it only once per process.
+    """
+    return YearData(year, region)
+
+
+def easter_date(year):
+    """
+    Date of Easter Sunday in the Gregorian calendar (anonymous Gregorian algorithm).
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def june_solstice_date(year, utc_offset_hours=0):
+    """
+    Local date of the June solstice, from Meeus' mean solstice approximation.
+    """
+    millennia = (year - 2000) / 1000
+    julian_day = (
+        2451716.56767
+        + 365241.62603 * millennia
+        + 0.00325 * millennia**2
+        - 0.00888 * millennia**3
+        - 0.00030 * millennia**4
+    )
+    moment = datetime.datetime(2000, 1, 1, 12) + datetime.timedelta(
+        days=julian_day - 2451545.0, hours=utc_offset_hours
+    )
+    return moment.date()
+
+
+class HolidayCalendar:
+    """
+    Holiday rules for a region, resolved into per-month sets of days for any year.
+
+    Supported rule types:
+    - fixed: same month and day every year.
+    - date: a single date, for one-off holidays.
+    - easter: offset in days from Easter Sunday.
+    - nth_weekday: n-th weekday (0 is Monday) of a month, negative n counts from the end.
+    - june_solstice: local date of the June solstice.
+
+    Any rule can set "since"/"until" years, "only_on_weekdays", a list of the weekdays (0 is
+    Monday) the date must fall on for the holiday to exist, and a "transfer" table, mapping the
+    weekday the holiday falls on to the number of days it is moved.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._years = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load rules from a JSON rules file or an ICS file.
+        """
+        path = Path(path)
+        with open(path, "r", encoding="utf8") as file:
+            text = file.read()
+        if path.suffix.lower() == ".ics":
+            return cls(cls.rules_from_ics(text))
+        return cls(json.loads(text)["rules"])
+
+    @staticmethod
+    def rules_from_ics(text):
+        """
+        Convert all-day events of an ICS file into rules. Yearly events become fixed rules.
+        """
+        # Unfold continuation lines before splitting into properties.
+        lines = text.replace("\r\n", "\n").replace("\n ", "").replace("\n\t", "")
+        rules = []
+        event = None
+        for line in lines.split("\n"):
+            name, _, value = line.partition(":")
+            name = name.split(";")[0].upper()
+            if name == "BEGIN" and value.strip() == "VEVENT":
+                event = {}
+            elif name == "END" and value.strip() == "VEVENT":
+                if event and "DTSTART" in event:
+                    date_value = event["DTSTART"][:8]
+                    year, month, day = (
+                        int(date_value[:4]),
+                        int(date_value[4:6]),
+                        int(date_value[6:8]),
+                    )
+                    rule = {
+                        "name": event.get("SUMMARY", ""),
+                        "month": month,
+                        "day": day,
+                    }
+                    if "FREQ=YEARLY" in event.get("RRULE", "").upper():
+                        rule.update(type="fixed", since=year)
+                    else:
+                        rule.update(type="date", year=year)
+                    rules.append(rule)
+                event = None
+            elif event is not None:
+                event[name] = value.strip()
+        return rules
+
+    @staticmethod
+    def rule_date(rule, year):
+        """
+        Resolve a single rule for a year. Returns None if the rule does not apply.
+        """
+        if not rule.get("since", year) <= year <= rule.get("until", year):
+            return None
+        match rule["type"]:
+            case "fixed":
+                date = datetime.date(year, rule["month"], rule["day"])
+            case "date":
+                if rule["year"] != year:
+                    return None
+                date = datetime.date(year, rule["month"], rule["day"])
+            case "easter":
+                date = easter_date(year) + datetime.timedelta(rule.get("offset", 0))
+            case "nth_weekday":
+                n = rule["n"]
+                if n > 0:
+                    first = datetime.date(year, rule["month"], 1)
+                    shift = (rule["weekday"] - first.weekday()) % 7
+                    date = first + datetime.timedelta(shift + 7 * (n - 1))
+                else:
+                    n_days = YearData.month_lengths(year)[rule["month"] - 1]
+                    last = datetime.date(year, rule["month"], n_days)
+                    shift = (last.weekday() - rule["weekday"]) % 7
+                    date = last - datetime.timedelta(shift + 7 * (-n - 1))
+            case "june_solstice":
+                date = june_solstice_date(year, rule.get("utc_offset_hours", 0))
+            case _:
+                raise ValueError(f"Unknown holiday rule type: {rule['type']}")
+        if date.weekday() not in rule.get("only_on_weekdays", range(7)):
+            return None
+        transfer = rule.get("transfer", {})
+        shift = transfer.get(str(date.weekday()), 0)
+        return date + datetime.timedelta(shift)
+
+    def holidays(self, year):
+        """
+        Holidays of a year, as a tuple of 12 frozensets of day numbers, one per month.
+        """
+        if year not in self._years:
+            months = [set() for _ in range(12)]
+            for rule in self.rules:
+                date = self.rule_date(rule, year)
+                if date is not None and date.year == year:
+                    months[date.month - 1].add(date.day)
+            self._years[year] = tuple(frozenset(days) for days in months)
+        return self._years[year]
+
+
+@functools.lru_cache(maxsize=None)
+def get_holiday_calendar(region):
+    """
+    Load the holiday rules for a region from the holidays directory, as JSON or ICS.
+    """
+    for suffix in (".json", ".ics"):
+        path = HOLIDAYS_DIR / f"{region}{suffix}"
+        if path.exists():
+            return HolidayCalendar.load(path)
+    raise FileNotFoundError(f"No holiday rules for region {region} in {HOLIDAYS_DIR}")
+
+
+def resolve_holidays(regions, years):
+    """
+    Resolve the holidays of many regions and years in bulk.
+
+    :return: Dictionary of (region, year) -> tuple of 12 frozensets of day numbers.
+    """
+    return {
+        (region, year): get_holiday_calendar(region).holidays(year)
+        for region in regions
+        for year in years
+    }
+
+
+class MonthData:
+    def __init__(self, year_data, index):
+        self.year = year_data.year
+        self.index = index
+        self.n_days = year_data.month_days[index]
+        self.start_index = year_data.month_starting_day_indexes[index]
+        self.holidays = year_data.holidays[index]
+        self.region = year_data.region
+
+
+class MonthCells:
+    """
+    The 42 day cells (6 weeks, from the Monday of its first week) shown for a month.
+
+    Parallel arrays with one entry per cell: day number, month offset (-1 previous month,
+    0 current, 1 next), weekday (0 is Monday) and flags. Shared by the month grid and the
+    minimonth builders, so both agree on numbering and holidays.
+    """
+
+    HOLIDAY = 1
+    # Current month days past the 5 week rows, drawn as half cells by the month grid.
+    OVERFLOW = 2
+
+    __slots__ = ("start_index", "n_days", "days", "month_offsets", "weekdays", "flags")
+
+    def __init__(self, current_month, previous_month, next_month):
+        start = current_month.start_index
+        end = start + current_month.n_days
+        self.start_index = start
+        self.n_days = current_month.n_days
+        self.days = array("B")
+        self.month_offsets = array("b")
+        self.weekdays = array("B")
+        self.flags = array("B")
+        for index in range(42):
+            if index < start:
+                month, day = previous_month, previous_month.n_days - start + 1 + index
+            elif index < end:
+                month, day = current_month, index - start + 1
+            else:
+                month, day = next_month, index - end + 1
+            offset = -1 if index < start else (0 if index < end else 1)
+            weekday = index % 7
+            flags = 0
+            if day in month.holidays or isSunday(weekday):
+                flags |= self.HOLIDAY
+            if offset == 0 and index >= 35:
+                flags |= self.OVERFLOW
+            self.days.append(day)
+            self.month_offsets.append(offset)
+            self.weekdays.append(weekday)
+            self.flags.append(flags)
+
+    def indexes(self, month_offset):
+        """
+        Cell indexes of the previous (-1), current (0) or next (1) month days.
+        """
+        end = self.start_index + self.n_days
+        if month_offset < 0:
+            return range(self.start_index)
+        if month_offset > 0:
+            return range(end, 42)
+        return range(self.start_index, end)
+
+
+def check_year(year):
+    """
+    Check that a calendar can be rendered for a year.
+
+    :raise ValueError: If year is outside MIN_YEAR to MAX_YEAR.
+    """
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f"Year must be from {MIN_YEAR} to {MAX_YEAR}, got {year}")
+
+
+@functools.lru_cache(maxsize=512)
+def get_month_cells(year, index, region=DEFAULT_HOLIDAY_REGION):
+    """
+    Get the MonthCells for a month, building them only once per process.
+    """
+    year_data = get_year_data(year, region)
+    if index == 0:
+        previous_month = MonthData(get_year_data(year - 1, region), 11)
+    else:
+        previous_month = MonthData(year_data, index - 1)
+    if index == 11:
+        next_month = MonthData(get_year_data(year + 1, region), 0)
+    else:
+        next_month = MonthData(year_data, index + 1)
+    return MonthCells(MonthData(year_data, index), previous_month, next_month)
+
+
+def mm_to_px(length_in_mm):
+    return 3.78 * length_in_mm
+
+
+def px_to_mm(length_in_px):
+    return length_in_px / 3.78
+
+
+def isSunday(day_index):
+    return day_index % 7 == 6
+
+
+def getPropertyFromCSS(css, inSelector, inProperty):
+    return StyleIndex.from_string(css).get(inSelector, inProperty)
+
+
+class _ProfileStage:
+    # Context manager timing one stage call, see Profiler.stage.
+
+    __slots__ = ("profiler", "name", "start", "wall_start", "memory_start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.memory:
+            self.memory_start = self.profiler.reset_memory_peak()
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        peak = retained = None
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.profiler.memory_high = max(self.profiler.memory_high, peak)
+            peak -= self.memory_start
+            retained = current - self.memory_start
+        self.profiler.events.append(
+            (
+                self.name,
+                self.profiler.page,
+                os.getpid(),
+                self.wall_start,
+                duration,
+                peak,
+                retained,
+            )
+        )
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Profiler:
+    """
+    Opt-in recorder of wall time and calls per render stage, and of elements and bytes per page.
+
+    Disabled by default, where stage() returns a shared no-op context manager. Workers record
+    their events and pages, drain() them into the task result, and the parent merge()s them.
+
+    With memory enabled, allocations are traced with tracemalloc: each stage records its peak
+    and retained bytes above the memory in use when it started, and each page the process peak
+    and the bytes still allocated once the page is saved and garbage is collected.
+    """
+
+    formats = ("json", "csv", "chrome")
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.memory_high = 0
+        self.page = ""
+        self.page_memory_start = 0
+        self.events = []
+        self.pages = []
+
+    def enable(self, memory=False):
+        self.enabled = True
+        if memory:
+            self.memory = True
+            if not tracemalloc.is_tracing():
+                # Imported before tracing, so the first page does not retain the modules.
+                preload_modules()
+                tracemalloc.start()
+
+    def reset_memory_peak(self):
+        """
+        Fold the traced peak into memory_high and restart peak tracking.
+
+        :return: Bytes currently allocated.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        self.memory_high = max(self.memory_high, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def stage(self, name):
+        """
+        Time a block of code as one call of a stage: `with profiler.stage("grid"): ...`.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _ProfileStage(self, name)
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function as one call of a stage.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def begin_page(self, label):
+        self.page = label
+        if self.memory:
+            gc.collect()
+            self.page_memory_start = self.reset_memory_peak()
+            self.memory_high = self.page_memory_start
+
+    def end_page(self, elements, size, seconds):
+        """
+        Record a page rendered since begin_page.
+
+        :param elements: Number of SVG elements written.
+        :param size: Bytes written.
+        """
+        if self.enabled:
+            page = {
+                "page": self.page,
+                "pid": os.getpid(),
+                "elements": elements,
+                "bytes": size,
+                "seconds": seconds,
+                "memory_peak": None,
+                "memory_retained": None,
+            }
+            if self.memory:
+                gc.collect()
+                current = self.reset_memory_peak()
+                page["memory_peak"] = self.memory_high
+                page["memory_retained"] = current - self.page_memory_start
+            self.pages.append(page)
+        self.page = ""
+
+    def drain(self):
+        """
+        Remove and return the (events, pages) recorded by this process.
+
+        Events a forked worker inherited from its parent are left out, the parent has them.
+        """
+        pid = os.getpid()
+        recorded = (
+            [event for event in self.events if event[2] == pid],
+            [page for page in self.pages if page["pid"] == pid],
+        )
+        self.events = []
+        self.pages = []
+        return recorded
+
+    def merge(self, recorded):
+        events, pages = recorded
+        self.events.extend(events)
+        self.pages.extend(pages)
+
+    def summary(self):
+        """
+        Get the [calls, seconds, highest peak bytes] totals of each stage, by stage name.
+        """
+        totals = {}
+        for name, _, _, _, duration, peak, _ in self.events:
+            stage_totals = totals.setdefault(name, [0, 0.0, None])
+            stage_totals[0] += 1
+            stage_totals[1] += duration
+            if peak is not None:
+                stage_totals[2] = max(stage_totals[2] or 0, peak)
+        return totals
+
+    def memory_peak(self):
+        """
+        Highest traced memory of any process, in bytes. None if memory is not traced.
+        """
+        if not self.memory:
+            return None
+        peaks = [page["memory_peak"] for page in self.pages]
+        return max(peaks + [self.memory_high, tracemalloc.get_traced_memory()[1]])
+
+    def leaking_pages(self, tolerance):
+        """
+        Get the pages still holding more than tolerance bytes once saved.
+        """
+        return [
+            page
+            for page in self.pages
+            if page["memory_retained"] is not None
+            and page["memory_retained"] > tolerance
+        ]
+
+    def write(self, path, trace_format=None):
+        """
+        Write the recorded trace.
+
+        :param trace_format: "json", "csv" or "chrome" (trace-event format, for chrome://tracing
+            or Perfetto). Defaults to csv for .csv paths and json otherwise.
+        """
+        path = Path(path)
+        if trace_format is None:
+            trace_format = "csv" if path.suffix.lower() == ".csv" else "json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if trace_format == "csv":
+            with open(path, "w", encoding="utf8", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(
+                    [
+                        "stage",
+                        "page",
+                        "pid",
+                        "start",
+                        "seconds",
+                        "memory_peak",
+                        "memory_retained",
+                        "elements",
+                        "bytes",
+                    ]
+                )
+                for event in self.events:
+                    writer.writerow(
+                        ["" if value is None else value for value in event] + ["", ""]
+                    )
+                for page in self.pages:
+                    writer.writerow(
+                        [
+                            "page",
+                            page["page"],
+                            page["pid"],
+                            "",
+                            page["seconds"],
+                            page["memory_peak"] or "",
+                            page["memory_retained"] or "",
+                            page["elements"],
+                            page["bytes"],
+                        ]
+                    )
+            return
+        if trace_format == "chrome":
+            trace = {
+                "traceEvents": [
+                    {
+                        "name": name,
+                        "cat": "calendar",
+                        "ph": "X",
+                        "ts": start * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": pid,
+                        "tid": pid,
+                        "args": {
+                            "page": page,
+                            "memory_peak": peak,
+                            "memory_retained": retained,
+                        },
+                    }
+                    for name, page, pid, start, duration, peak, retained in self.events
+                ],
+                "displayTimeUnit": "ms",
+                "otherData": {"pages": self.pages},
+            }
+        else:
+            trace = {
+                "stages": {
+                    name: {"calls": calls, "seconds": seconds, "memory_peak": peak}
+                    for name, (calls, seconds, peak) in self.summary().items()
+                },
+                "memory_peak": self.memory_peak(),
+                "pages": self.pages,
+                "events": [
+                    {
+                        "stage": name,
+                        "page": page,
+                        "pid": pid,
+                        "start": start,
+                        "seconds": duration,
+                        "memory_peak": peak,
+                        "memory_retained": retained,
+                    }
+                    for name, page, pid, start, duration, peak, retained in self.events
+                ],
+            }
+        with open(path, "w", encoding="utf8") as file:
+            json.dump(trace, file, indent=1)
+
+
+_NULL_STAGE = _NullStage()
+profiler = Profiler()
+
+
+class StyleIndex:
+    """
+    Selector to property lookup table for a parsed stylesheet.
+
+    Stylesheets loaded from a file are memoized by path and modification time, and the parsed
+    table is cached on disk by content hash, so an unchanged stylesheet is only parsed once.
+    """
+
+    # Length units in millimetres. px follows mm_to_px.
+    units_in_mm = {
+        "mm": 1.0,
+        "cm": 10.0,
+        "in": 25.4,
+        "pt": 25.4 / 72,
+        "pc": 25.4 / 6,
+        "px": 1 / 3.78,
+    }
+
+    _loaded = {}
+
+    def __init__(self, text, properties):
+        """
+        :param text: Stylesheet source.
+        :param properties: Dictionary of selector -> {property name: value}.
+        """
+        self.text = text
+        self.properties = properties
+
+    @classmethod
+    def from_string(cls, text):
+        import cssutils  # Slow to import, only needed when the disk cache misses.
+
+        # Log through the configured handlers instead of cssutils' own stderr handler. Its
+        # warnings are about SVG properties CSS does not know (fill, stroke, text-anchor...).
+        logger = logging.getLogger("cssutils")
+        logger.setLevel(logging.ERROR)
+        cssutils.log.setLog(logger)
+        properties = {}
+        for rule in cssutils.parseString(text):
+            if rule.type == rule.STYLE_RULE:
+                for selector_entry in rule.selectorList:
+                    selector_properties = properties.setdefault(
+                        selector_entry.selectorText, {}
+                    )
+                    for property_entry in rule.style:
+                        selector_properties[property_entry.name] = property_entry.value
+        return cls(text, properties)
+
+    @classmethod
+    @profiler.timed("css_load")
+    def load(cls, css_path, cache_dir=None):
+        """
+        Load and index a stylesheet file.
+
+        :param css_path: Path to the CSS file.
+        :param cache_dir: Directory for cached indexes. None disables the disk cache.
+        """
+        css_path = Path(css_path)
+        stat = css_path.stat()
+        memo_key = (str(css_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        if memo_key in cls._loaded:
+            return cls._loaded[memo_key]
+
+        with open(css_path, "r") as file:
+            text = file.read()
+        cache_path = None
+        style_index = None
+        if cache_dir is not None:
+            text_hash = hashlib.sha256(text.encode("utf8")).hexdigest()
+            cache_path = Path(cache_dir) / "styles" / f"{text_hash}.json"
+            if cache_path.exists():
+                with open(cache_path, "r", encoding="utf8") as file:
+                    style_index = cls(text, json.load(file))
+        if style_index is None:
+            logging.info(f"Parsing stylesheet {css_path}")
+            style_index = cls.from_string(text)
+            if cache_path is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(cache_path, "w", encoding="utf8") as file:
+                    json.dump(style_index.properties, file)
+
+        cls._loaded[memo_key] = style_index
+        return style_index
+
+    def get(self, selector, property_name, default=None):
+        return self.properties.get(selector, {}).get(property_name, default)
+
+    def length_mm(self, selector, property_name):
+        """
+        Get a length property converted to millimetres.
+        """
+        value = self.get(selector, property_name)
+        if value is None:
+            raise KeyError(f"{selector} has no {property_name} property")
+        number = value.rstrip(string.ascii_letters)
+        unit = value[len(number) :] or "px"
+        if unit not in self.units_in_mm:
+            raise ValueError(f"Unsupported unit in {selector} {property_name}: {value}")
+        return float(number) * self.units_in_mm[unit]
+
+    def font_size_mm(self, selector):
+        return self.length_mm(selector, "font-size")
+
+
+# Characters every font subset keeps, so the embedded font (and every page fingerprint) only
+# changes when a text uses a character outside this set.
+BASE_FONT_CHARACTERS = frozenset(
+    string.ascii_letters
+    + string.digits
+    + string.punctuation
+    + " "
+    + "".join(chr(code) for code in range(0xA1, 0x100))
+    + "–—‘’“”…€"
+)
+
+
+def collect_font_characters(photo_texts):
+    """
+    Get every character that can be drawn with the embedded font during a run.
+
+    The result always includes BASE_FONT_CHARACTERS.
+
+    :param photo_texts: List of (summary, description) pairs, one per month.
+    """
+    texts = [string.digits, " /", MINI_WEEKDAY_LETTERS]
+    texts += WEEKDAY_NAMES
+    texts += [YearData.month_names(index) for index in range(12)]
+    for summary, description in photo_texts:
+        texts += [summary, description]
+    return BASE_FONT_CHARACTERS | frozenset(
+        char for char in "".join(texts) if char.isprintable()
+    )
+
+
+def base64_data(data, mimetype):
+    """
+    Encode bytes as a base64 data URI, like svgwrite.utils.base64_data.
+    """
+    return f"data:{mimetype};charset=utf-8;base64,{base64.b64encode(data).decode()}"
+
+
+@profiler.timed("font_embed")
+def load_font_data_uri(font_path, characters, cache_dir=None):
+    """
+    Subset a font to the given characters and encode it as a base64 data URI.
+
+    The result is cached on disk, keyed by the font file hash and the character set.
+
+    :param font_path: Path to the font file.
+    :param characters: Characters that must be kept in the subset.
+    :param cache_dir: Directory for cached data URIs. None disables the disk cache.
+    """
+    font_bytes = font_path.read_bytes()
+    glyph_text = "".join(sorted(characters))
+    cache_key = hashlib.sha256(
+        hashlib.sha256(font_bytes).digest() + glyph_text.encode("utf8")
+    ).hexdigest()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / "fonts" / f"{cache_key}.txt"
+        if cache_path.exists():
+            logging.info(f"Using cached font data for {font_path} ({cache_path})")
+            return cache_path.read_text(encoding="ascii")
+
+    font_subset = optional_module("fontTools.subset")
+    if font_subset is None:
+        logging.warning("fontTools is not installed, embedding the full font")
+    else:
+        options = font_subset.Options()
+        options.layout_features = ["*"]
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        font = font_subset.load_font(str(font_path), options)
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(text=glyph_text)
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font_subset.save_font(font, buffer, options)
+        font.close()
+        logging.info(
+            f"Font subset to {len(characters)} characters: {len(font_bytes)} -> {buffer.tell()} bytes"
+        )
+        font_bytes = buffer.getvalue()
+
+    data_uri = base64_data(font_bytes, FONT_MIMETYPES[font_path.suffix.lower()])
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(data_uri, encoding="ascii")
+    return data_uri
+
+
+class GlyphAdvances:
+    """
+    Advance widths of a font at one size, for measuring text without a renderer.
+
+    Advances of the first DENSE_CODEPOINTS code points are kept in a flat array, the few others
+    in a dictionary. Characters missing from the font use the .notdef advance. Kerning is ignored.
+    """
+
+    DENSE_CODEPOINTS = 0x300
+
+    def __init__(self, advances, extra, default):
+        """
+        :param advances: array of advances, indexed by code point.
+        :param extra: Dictionary of code point -> advance, beyond the array.
+        :param default: Advance of characters missing from the font.
+        """
+        self.advances = advances
+        self.extra = extra
+        self.default = default
+
+    def width(self, text):
+        advances = self.advances
+        dense = len(advances)
+        extra = self.extra
+        default = self.default
+        total = 0.0
+        for char in text:
+            code = ord(char)
+            total += advances[code] if code < dense else extra.get(code, default)
+        return total
+
+
+@functools.lru_cache(maxsize=8)
+def _font_unit_advances(font_path, mtime_ns):
+    # Advances in font units, memoized by path and modification time.
+    font = optional_module("fontTools.ttLib").TTFont(font_path, lazy=True)
+    metrics = font["hmtx"].metrics
+    default = metrics[font.getGlyphOrder()[0]][0]
+    advances = array("H", [default]) * GlyphAdvances.DENSE_CODEPOINTS
+    extra = {}
+    for code, glyph_name in font.getBestCmap().items():
+        if code < GlyphAdvances.DENSE_CODEPOINTS:
+            advances[code] = metrics[glyph_name][0]
+        else:
+            extra[code] = metrics[glyph_name][0]
+    units_per_em = font["head"].unitsPerEm
+    font.close()
+    return advances, extra, default, units_per_em
+
+
+@functools.lru_cache(maxsize=32)
+def get_glyph_advances(font_path, font_size_mm):
+    """
+    Get the advance widths of a font at a font size, in px. Memoized per (font, size).
+
+    :return: GlyphAdvances, or None if fontTools is not installed.
+    """
+    if optional_module("fontTools.ttLib") is None:
+        return None
+    font_path = Path(font_path)
+    advances, extra, default, units_per_em = _font_unit_advances(
+        str(font_path.resolve()), font_path.stat().st_mtime_ns
+    )
+    scale = mm_to_px(font_size_mm) / units_per_em
+    return GlyphAdvances(
+        array("f", (advance * scale for advance in advances)),
+        {code: advance * scale for code, advance in extra.items()},
+        default * scale,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def wrap_text(text, max_width, glyph_advances):
+    """
+    Break text into lines no wider than max_width px, breaking at spaces.
+
+    A word wider than max_width is left alone on its line, see fit_font_size.
+
+    :param glyph_advances: GlyphAdvances of the font and size the text is drawn with.
+    :return: Tuple of lines.
+    """
+    if max_width <= 0:
+        raise ValueError(f"Text width must be positive, got {max_width}")
+    space_width = glyph_advances.width(" ")
+    lines = []
+    line = []
+    line_width = 0.0
+    for word in text.split():
+        word_width = glyph_advances.width(word)
+        if line and line_width + space_width + word_width > max_width:
+            lines.append(" ".join(line))
+            line = []
+            line_width = 0.0
+        line_width += word_width + (space_width if line else 0.0)
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return tuple(lines)
+
+
+def fit_font_size(text, max_width, glyph_advances, font_size_mm):
+    """
+    Get the inline style shrinking text to max_width px, or None if it already fits.
+    """
+    if max_width <= 0:
+        raise ValueError(f"Text width must be positive, got {max_width}")
+    width = glyph_advances.width(text.strip())
+    if width <= max_width:
+        return None
+    return f"font-size:{font_size_mm * max_width / width:.2f}mm"
+
+
+class FragmentCache:
+    """
+    Bounded LRU cache of rendered SVG fragments, with hit and miss counters.
+
+    Every cache is registered by name so run statistics can be collected with cache_stats().
+    """
+
+    registry = {}
+
+    def __init__(self, name, maxsize=128):
+        self.name = name
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        FragmentCache.registry[name] = self
+
+    def get(self, key, build):
+        """
+        Get the fragment for a key, calling build() to create it on a miss.
+        """
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        fragment = build()
+        self.entries[key] = fragment
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def cache_stats():
+    """
+    Get the (hits, misses) counters of every fragment cache, by name.
+    """
+    return {
+        name: (cache.hits, cache.misses)
+        for name, cache in FragmentCache.registry.items()
+    }
+
+
+def translate(tx, ty=None):
+    """
+    Format a translate transform the same way svgwrite does.
+    """
+    return "translate(%s)" % ",".join(
+        str(value) for value in (tx, ty) if value is not None
+    )
+
+
+def preload_modules():
+    """
+    Import the lazily imported modules used while rendering pages, and read the font metrics.
+    """
+    svgwrite_classes()
+    if optional_module("fontTools.ttLib") is not None:
+        _font_unit_advances(str(FONT_PATH.resolve()), FONT_PATH.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=None)
+def svgwrite_classes():
+    """
+    Import svgwrite on first use and get the element classes SvgwriteBackend builds, by tag.
+
+    Only the svgwrite backend needs svgwrite, so the stream backend never imports it.
+    """
+    import svgwrite
+
+    class CachedFragment(svgwrite.base.BaseElement, svgwrite.mixins.Transform):
+        """
+        Group element wrapping an already serialized fragment.
+
+        The fragment is shared between drawings, only the attributes of this wrapper (e.g. its
+        transform) are applied on top of it when the drawing is written.
+        """
+
+        elementname = "g"
+
+        def __init__(self, fragment, **extra):
+            """
+            :param fragment: Serialized ElementTree element of a group.
+            """
+            super().__init__(**extra)
+            self.fragment = fragment
+
+        def get_xml(self):
+            # A new element sharing the cached children: the cached element is not modified.
+            attributes = dict(self.fragment.attrib)
+            attributes.update(super().get_xml().attrib)
+            xml = self.fragment.makeelement(
+                self.fragment.tag,
+                {attribute: attributes[attribute] for attribute in sorted(attributes)},
+            )
+            xml.text = self.fragment.text
+            xml.extend(self.fragment)
+            return xml
+
+    return {
+        "svg": svgwrite.Drawing,
+        "style": svgwrite.container.Style,
+        "g": svgwrite.container.Group,
+        "symbol": svgwrite.container.Symbol,
+        "text": svgwrite.text.Text,
+        "polyline": svgwrite.shapes.Polyline,
+        "rect": svgwrite.shapes.Rect,
+        "use": svgwrite.container.Use,
+        "image": svgwrite.image.Image,
+        "fragment": CachedFragment,
+    }
+
+
+class SvgwriteBackend:
+    """
+    Reference output backend, building the page as a svgwrite element tree.
+
+    Builders emit elements through start/end/leaf/fragment calls. This backend turns them into
+    svgwrite objects, with svgwrite's validation, and serializes the drawing on close.
+    """
+
+    name = "svgwrite"
+    # Leaves whose first constructor argument is taken from the text or an attribute.
+    leaf_arguments = {"polyline": "points", "use": "xlink:href", "image": "xlink:href"}
+
+    def __init__(self, root=None):
+        """
+        :param root: Container the emitted elements are added to. Defaults to a new Group.
+        """
+        self.classes = svgwrite_classes()
+        self.root = root if root is not None else self.classes["g"]()
+        self.stack = [self.root]
+        self.drawing = None
+        self.fileobj = None
+        self.element_count = 0
+
+    def begin_document(self, fileobj, size, viewbox=None):
+        """
+        Start a drawing written to fileobj on close.
+
+        :param size: Width and height strings, e.g. ("297mm", "210mm").
+        :param viewbox: Optional (min_x, min_y, width, height).
+        """
+        self.fileobj = fileobj
+        self.drawing = self.classes["svg"](size=size, profile="full")
+        if viewbox is not None:
+            self.drawing.viewbox(*viewbox)
+        self.stack = [self.drawing]
+        self.element_count += 1
+
+    def begin_defs(self):
+        self.stack.append(self.drawing.defs)
+        self.element_count += 1
+
+    def end_defs(self):
+        self.stack.pop()
+
+    def style(self, content):
+        self.stack[-1].add(self.classes["style"](content))
+        self.element_count += 1
+
+    def start(self, tag, attribs=None):
+        group = self.classes[tag]()
+        self._set_attributes(group, attribs)
+        self.stack[-1].add(group)
+        self.stack.append(group)
+        self.element_count += 1
+
+    def end(self):
+        self.stack.pop()
+
+    def leaf(self, tag, attribs=None, text=None):
+        attribs = dict(attribs or {})
+        if tag == "text":
+            element = self.classes[tag](text)
+        elif tag in self.leaf_arguments:
+            element = self.classes[tag](attribs.pop(self.leaf_arguments[tag]))
+        else:
+            element = self.classes[tag]()
+        self._set_attributes(element, attribs)
+        self.stack[-1].add(element)
+        self.element_count += 1
+
+    def build_fragment(self, emit):
+        """
+        Build a cacheable fragment from an emit(backend) call that emits a single group.
+        """
+        builder = SvgwriteBackend()
+        emit(builder)
+        return builder.root.elements[0].get_xml()
+
+    def fragment(self, fragment, attribs=None):
+        element = self.classes["fragment"](fragment)
+        self._set_attributes(element, attribs)
+        self.stack[-1].add(element)
+        self.element_count += sum(1 for _ in fragment.iter())
+
+    def close(self):
+        self.drawing.write(self.fileobj)
+
+    @staticmethod
+    def _set_attributes(element, attribs):
+        for name, value in (attribs or {}).items():
+            element[name] = value
+
+
+class StreamFragment:
+    """
+    Serialized group for the streaming backend: its tag, attributes and inner markup.
+    """
+
+    def __init__(self, tag, attribs, markup, element_count=1):
+        self.tag = tag
+        self.attribs = attribs
+        self.markup = markup
+        self.element_count = element_count
+
+
+class SVGStreamWriter:
+    """
+    Output backend writing elements to a text file as soon as they are emitted.
+
+    No element tree is built and nothing is validated. Attributes are sorted and escaped like
+    ElementTree does, so documents are byte-equivalent to the svgwrite backend.
+    """
+
+    name = "stream"
+
+    def __init__(self, fileobj=None):
+        self.fileobj = fileobj
+        self.write = fileobj.write if fileobj is not None else None
+        self.open_tags = []
+        self.element_count = 0
+
+    def begin_document(self, fileobj, size, viewbox=None):
+        self.fileobj = fileobj
+        self.write = fileobj.write
+        self.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        attribs = {
+            "baseProfile": "full",
+            "height": size[1],
+            "version": "1.1",
+            "width": size[0],
+            "xmlns": "http://www.w3.org/2000/svg",
+            "xmlns:ev": "http://www.w3.org/2001/xml-events",
+            "xmlns:xlink": "http://www.w3.org/1999/xlink",
+        }
+        if viewbox is not None:
+            attribs["viewBox"] = ",".join(str(value) for value in viewbox)
+        self.start("svg", attribs)
+
+    def begin_defs(self):
+        self.start("defs")
+
+    def end_defs(self):
+        self.end()
+
+    def style(self, content):
+        self.write(f'<style type="text/css"><![CDATA[{content}]]></style>')
+        self.element_count += 1
+
+    def start(self, tag, attribs=None):
+        self.write(f"<{tag}{self._attributes(attribs)}>")
+        self.open_tags.append(tag)
+        self.element_count += 1
+
+    def end(self):
+        self.write(f"</{self.open_tags.pop()}>")
+
+    def leaf(self, tag, attribs=None, text=None):
+        if text is None:
+            self.write(f"<{tag}{self._attributes(attribs)} />")
+        else:
+            self.write(
+                f"<{tag}{self._attributes(attribs)}>{self._escape_text(str(text))}</{tag}>"
+            )
+        self.element_count += 1
+
+    def build_fragment(self, emit):
+        buffer = io.StringIO()
+        recorder = _FragmentRecorder(buffer)
+        emit(recorder)
+        return StreamFragment(
+            recorder.tag, recorder.attribs, buffer.getvalue(), recorder.element_count
+        )
+
+    def fragment(self, fragment, attribs=None):
+        merged = dict(fragment.attribs)
+        merged.update(attribs or {})
+        self.write(f"<{fragment.tag}{self._attributes(merged)}>")
+        self.write(fragment.markup)
+        self.write(f"</{fragment.tag}>")
+        self.element_count += fragment.element_count
+
+    def close(self):
+        while self.open_tags:
+            self.end()
+
+    @classmethod
+    def _attributes(cls, attribs):
+        if not attribs:
+            return ""
+        parts = []
+        for name in sorted(attribs):
+            value = attribs[name]
+            if value is None:
+                continue
+            if name == "points":
+                value = " ".join(f"{x},{y}" for x, y in value)
+            value = str(value)
+            if value:
+                parts.append(f' {name}="{cls._escape_attribute(value)}"')
+        return "".join(parts)
+
+    @staticmethod
+    def _escape_text(text):
+        if "&" in text:
+            text = text.replace("&", "&amp;")
+        if "<" in text:
+            text = text.replace("<", "&lt;")
+        if ">" in text:
+            text = text.replace(">", "&gt;")
+        return text
+
+    @classmethod
+    def _escape_attribute(cls, text):
+        text = cls._escape_text(text)
+        if '"' in text:
+            text = text.replace('"', "&quot;")
+        if "\r" in text:
+            text = text.replace("\r", "&#13;")
+        if "\n" in text:
+            text = text.replace("\n", "&#10;")
+        if "\t" in text:
+            text = text.replace("\t", "&#09;")
+        return text
+
+
+class _FragmentRecorder(SVGStreamWriter):
+    # Writes only the inner markup of the outermost group, and keeps its tag and attributes.
+
+    def __init__(self, fileobj):
+        super().__init__(fileobj)
+        self.tag = None
+        self.attribs = None
+
+    def start(self, tag, attribs=None):
+        if self.tag is None:
+            self.tag = tag
+            self.attribs = dict(attribs or {})
+            self.open_tags.append(tag)
+            self.element_count += 1
+        else:
+            super().start(tag, attribs)
+
+    def end(self):
+        if len(self.open_tags) == 1:
+            self.open_tags.pop()
+        else:
+            super().end()
+
+
+def round_number(value, precision):
+    """
+    Round a coordinate to precision decimals, dropping the fraction of whole numbers.
+    """
+    value = round(value, precision)
+    return int(value) if value == int(value) else value
+
+
+_DECIMAL = re.compile(r"-?\d+\.\d+")
+_CSS_STRING = re.compile(r"(\"[^\"]*\"|'[^']*')")
+_CSS_CLASS = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION_SPACE = re.compile(r"\s*([{};,>])\s*|(:)\s+")
+
+
+@functools.lru_cache(maxsize=16)
+def class_aliases(stylesheet):
+    """
+    Map each class selected in a stylesheet to a short alias: a, b, ..., z, ba, bb, ...
+
+    Aliases are assigned in sorted class name order, so they are the same for every page
+    rendered with the same stylesheet.
+    """
+    names = set()
+    for index, part in enumerate(_CSS_STRING.split(_CSS_COMMENT.sub("", stylesheet))):
+        if index % 2 == 0:
+            names.update(_CSS_CLASS.findall(part))
+    aliases = {}
+    for number, name in enumerate(sorted(names)):
+        alias = ""
+        while True:
+            alias = string.ascii_lowercase[number % 26] + alias
+            number //= 26
+            if number == 0:
+                break
+        aliases[name] = alias
+    return aliases
+
+
+def minify_css(text, aliases=None):
+    """
+    Remove comments and whitespace from a stylesheet, and rename classes to their aliases.
+
+    Quoted strings, such as font names and data URIs, are kept as they are.
+    """
+    parts = _CSS_STRING.split(_CSS_COMMENT.sub("", text))
+    for index in range(0, len(parts), 2):
+        part = _CSS_SPACE.sub(" ", parts[index])
+        part = _CSS_PUNCTUATION_SPACE.sub(
+            lambda match: match.group(1) or match.group(2), part
+        )
+        if aliases:
+            part = _CSS_CLASS.sub(
+                lambda match: "." + aliases.get(match.group(1), match.group(1)), part
+            )
+        parts[index] = part
+    return "".join(parts).replace(";}", "}").strip()
+
+
+class CompactBackend:
+    """
+    Output backend wrapper writing smaller documents through another backend.
+
+    Coordinates are rounded to precision decimals, stylesheets are minified and classes are
+    renamed to the short aliases of class_aliases, in both the stylesheet and the elements.
+    """
+
+    def __init__(self, inner, precision=2, aliases=None):
+        """
+        :param inner: Backend the compacted elements are emitted to.
+        :param aliases: Dictionary of class name -> alias. Other classes are kept.
+        """
+        self.inner = inner
+        self.precision = precision
+        self.aliases = aliases or {}
+        # The name keys fragment caches, so it covers the aliases fragments are written with.
+        self.name = f"{inner.name}-compact{precision}"
+        if self.aliases:
+            digest = hashlib.sha256(
+                json.dumps(sorted(self.aliases.items())).encode("utf8")
+            ).hexdigest()
+            self.name += f"-{digest[:16]}"
+
+    @property
+    def element_count(self):
+        return self.inner.element_count
+
+    def begin_document(self, fileobj, size, viewbox=None):
+        if viewbox is not None:
+            viewbox = tuple(round_number(value, self.precision) for value in viewbox)
+        self.inner.begin_document(fileobj, size, viewbox)
+
+    def begin_defs(self):
+        self.inner.begin_defs()
+
+    def end_defs(self):
+        self.inner.end_defs()
+
+    def style(self, content):
+        self.inner.style(minify_css(content, self.aliases))
+
+    def start(self, tag, attribs=None):
+        self.inner.start(tag, self._compact(attribs))
+
+    def end(self):
+        self.inner.end()
+
+    def leaf(self, tag, attribs=None, text=None):
+        self.inner.leaf(tag, self._compact(attribs), text)
+
+    def build_fragment(self, emit):
+        return self.inner.build_fragment(
+            lambda builder: emit(CompactBackend(builder, self.precision, self.aliases))
+        )
+
+    def fragment(self, fragment, attribs=None):
+        self.inner.fragment(fragment, self._compact(attribs))
+
+    def close(self):
+        self.inner.close()
+
+    def _compact(self, attribs):
+        if not attribs:
+            return attribs
+        precision = self.precision
+        compacted = {}
+        for name, value in attribs.items():
+            if isinstance(value, float):
+                value = round_number(value, precision)
+            elif name == "points":
+                value = [
+                    (round_number(x, precision), round_number(y, precision))
+                    for x, y in value
+                ]
+            elif name == "transform":
+                value = _DECIMAL.sub(
+                    lambda match: str(round_number(float(match.group()), precision)),
+                    value,
+                )
+            elif name == "class":
+                value = " ".join(
+                    self.aliases.get(class_name, class_name)
+                    for class_name in value.split()
+                )
+            compacted[name] = value
+        return compacted
+
+
+BACKENDS = {
+    SvgwriteBackend.name: SvgwriteBackend,
+    SVGStreamWriter.name: SVGStreamWriter,
+}
+
+grid_fragment_cache = FragmentCache("grid", maxsize=128)
+
+
+def emit_single_minimonth(out, minimonth_size, month_label, cells):
+    """
+    Emit the group for a minimonth to an output backend.
+
+    :param cells: MonthCells of the month.
+    """
+    miniday_size = (minimonth_size[0] / 7, minimonth_size[1] / 7)
+    border_percentage = 0.3
+    border_y_margin = border_percentage * miniday_size[1]
+    out.start("g")
+
+    # Make border
+    out.leaf(
+        "rect",
+        {
+            "class": "minicalendar_border",
+            "x": 0,
+            "y": 0,
+            "width": minimonth_size[0],
+            "height": minimonth_size[1] + border_y_margin,
+        },
+    )
+
+    # Fill month label
+    out.leaf(
+        "text",
+        {
+            "class": "mini_calendar_label",
+            "x": 0,
+            "y": 0,
+            "transform": translate(0, -border_y_margin),
+        },
+        month_label,
+    )
+
+    out.start(
+        "g", {"class": "minicalendar", "transform": translate(0, miniday_size[1])}
+    )
+
+    # Fill miniweekdays labels
+    for idx, day_letter in enumerate(MINI_WEEKDAY_LETTERS):
+        out.leaf(
+            "text",
+            {
+                "class": "mini_calendar_text",
+                "x": miniday_size[0] * 0.5 + miniday_size[0] * idx,
+                "y": 0,
+            },
+            day_letter,
+        )
+
+    # Fill month days, then previous and next month days
+    weekdays_offset = 1
+    for month_offset in (0, -1, 1):
+        for miniday_index in cells.indexes(month_offset):
+            holiday = cells.flags[miniday_index] & MonthCells.HOLIDAY
+            out.leaf(
+                "text",
+                {
+                    "class": " ".join(
+                        ["mini_calendar_text"]
+                        + (["off-day"] if month_offset else [])
+                        + (["holiday"] if holiday else ["regular-day"])
+                    ),
+                    "x": miniday_size[0] * 0.5
+                    + cells.weekdays[miniday_index] * miniday_size[0],
+                    "y": (weekdays_offset + (miniday_index // 7)) * miniday_size[1],
+                },
+                cells.days[miniday_index],
+            )
+
+    out.end()
+    out.end()
+
+
+def create_single_minimonth(
+    minimonth_size, month_label, current_month, prev_month, next_month
+):
+    builder = SvgwriteBackend()
+    emit_single_minimonth(
+        builder,
+        minimonth_size,
+        month_label,
+        MonthCells(current_month, prev_month, next_month),
+    )
+    return builder.root.elements[0]
+
+
+minimonth_fragment_cache = FragmentCache("minimonth", maxsize=64)
+
+
+def cached_minimonth(
+    out, minimonth_size, month_label, current_month, prev_month, next_month
+):
+    """
+    Get a minimonth fragment for a backend from minimonth_fragment_cache, emitting it on a miss.
+    """
+    key = (
+        out.name,
+        month_label,
+        current_month.start_index,
+        current_month.n_days,
+        current_month.holidays,
+        prev_month.n_days,
+        prev_month.holidays,
+        next_month.holidays,
+        tuple(minimonth_size),
+    )
+    return minimonth_fragment_cache.get(
+        key,
+        lambda: out.build_fragment(
+            lambda builder: emit_single_minimonth(
+                builder,
+                minimonth_size,
+                month_label,
+                get_month_cells(
+                    current_month.year, current_month.index, current_month.region
+                ),
+            )
+        ),
+    )
+
+
+def relative_month_data(years, index):
+    """
+    Get the MonthData for a month index relative to the current year.
+
+    :param years: (previous, current, next) YearData.
+    :param index: Month index, from -12 (January of the previous year) to 23.
+    """
+    previous_year, current_year, next_year = years
+    if index < 0:
+        return MonthData(previous_year, index + 12)
+    if index > 11:
+        return MonthData(next_year, index - 12)
+    return MonthData(current_year, index)
+
+
+def minimonth_neighbours(big_month_index, current_year, previous_year, next_year):
+    """
+    Get the (label, month, previous, next) data for the minimonths before and after a big month.
+    """
+    years = (previous_year, current_year, next_year)
+
+    def month_at(index):
+        return relative_month_data(years, index)
+
+    neighbours = []
+    for mini_index in (big_month_index - 1, big_month_index + 1):
+        mini_data = month_at(mini_index)
+        month_label = f"{YearData.month_names(mini_data.index)} {mini_data.year}"
+        neighbours.append(
+            (month_label, mini_data, month_at(mini_index - 1), month_at(mini_index + 1))
+        )
+    return neighbours
+
+
+def minimonth_symbol_id(month_data):
+    return f"minimonth_{month_data.year}_{month_data.index}"
+
+
+def emit_minimonth_symbols(out, minimonth_size, month_indexes, years, emitted):
+    """
+    Emit the symbols for the minimonths of several pages, skipping ids already in emitted.
+
+    :param years: (previous, current, next) YearData.
+    :param emitted: Set of symbol ids already emitted, updated in place.
+    """
+    previous_year, current_year, next_year = years
+    for month_index in month_indexes:
+        for label, mini_data, before, after in minimonth_neighbours(
+            month_index, current_year, previous_year, next_year
+        ):
+            symbol_id = minimonth_symbol_id(mini_data)
+            if symbol_id in emitted:
+                continue
+            emitted.add(symbol_id)
+            out.start("symbol", {"id": symbol_id, "overflow": "visible"})
+            out.fragment(
+                cached_minimonth(out, minimonth_size, label, mini_data, before, after)
+            )
+            out.end()
+
+
+def emit_minimonth_pair(
+    out,
+    minimonth_size,
+    big_month_index,
+    current_year,
+    previous_year,
+    next_year,
+    attribs=None,
+    use_symbols=False,
+):
+    """
+    Emit the minimonths for the months before and after the big month.
+
+    :param use_symbols: Reference the minimonths with use elements, for documents where they
+        were emitted with emit_minimonth_symbols.
+    """
+    out.start("g", attribs)
+    # First minimonth is the previous from big month, second is the next one.
+    for position, (label, mini_data, before, after) in enumerate(
+        minimonth_neighbours(big_month_index, current_year, previous_year, next_year)
+    ):
+        mini_attribs = {"transform": translate(minimonth_size[0])} if position else {}
+        if use_symbols:
+            mini_attribs["xlink:href"] = f"#{minimonth_symbol_id(mini_data)}"
+            out.leaf("use", mini_attribs)
+        else:
+            out.fragment(
+                cached_minimonth(out, minimonth_size, label, mini_data, before, after),
+                mini_attribs,
+            )
+    out.end()
+
+
+def create_minimonth_pair(
+    minimonth_size, big_month_index, current_year, previous_year, next_year
+):
+    builder = SvgwriteBackend()
+    emit_minimonth_pair(
+        builder,
+        minimonth_size,
+        big_month_index,
+        current_year,
+        previous_year,
+        next_year,
+    )
+    return builder.root.elements[0]
+
+
+def emit_month_grid(out, day_size, cells):
+    """
+    Emit the grid for a full month, plus the previous/next months' days if they fit.
+
+    :param cells: MonthCells of the month.
+    """
+    # Parameters
+    month_grid_parameters = {
+        "day_spacing_mm": 1,
+        "weekday_label_y_offset_mm": 1,
+        "number_text_offset_mm": 2,
+    }
+    day_spacing = mm_to_px(month_grid_parameters["day_spacing_mm"])
+    weekday_label_y_offset = mm_to_px(
+        month_grid_parameters["weekday_label_y_offset_mm"]
+    )
+    number_text_offset = (
+        mm_to_px(month_grid_parameters["number_text_offset_mm"]),
+        mm_to_px(month_grid_parameters["number_text_offset_mm"]),
+    )
+
+    logging.debug(
+        "Input parameters:\n"
+        f"days_in_month: {cells.n_days}\n"
+        f"month_day_start: {cells.start_index}"
+    )
+
+    out.start("g", {"class": "calendar_grid"})
+
+    def make_day_cell(
+        grid_index,
+        day_number,
+        day_size,
+        day_spacing,
+        text_offset,
+        off_month,
+        holiday,
+    ):
+        """
+        Make a cell for a single day.
+
+        :param grid_index: Index of the day to add. From 0 to 34.
+        :param day_number: Number for the day.
+        :param day_size: Size of the day cell, in px.
+        :param day_spacing: Spacing between cells, in px.
+        :param off_month: Whether the cell is out of the main month, i.e is a day from previous or next month.
+        """
+        current_row = grid_index // 7
+        current_col = grid_index % 7
+
+        x_stride = day_size[0]
+        y_stride = day_size[1]
+
+        cell_left = current_col * x_stride
+        cell_right = (current_col + 1) * x_stride
+        cell_top = current_row * y_stride
+        cell_bottom = (current_row + 1) * y_stride
+
+        start_point = (cell_left + day_spacing, cell_bottom)
+        corner_point = (cell_right, cell_bottom)
+        end_point = (cell_right, cell_top + day_spacing)
+
+        modifiers_classes = []
+        if off_month:
+            modifiers_classes.append("off-day")
+        if holiday:
+            modifiers_classes.append("holiday")
+        else:
+            modifiers_classes.append("regular-day")
+
+        out.leaf(
+            "polyline",
+            {
+                "class": " ".join(
+                    ["calendar_grid_line"] + (["off-day"] if off_month else [])
+                ),
+                "points": [start_point, corner_point, end_point],
+            },
+        )
+        out.leaf(
+            "text",
+            {
+                "class": " ".join(["calendar_grid_text"] + modifiers_classes),
+                "x": cell_left + text_offset[0],
+                "y": cell_top + text_offset[1],
+            },
+            day_number,
+        )
+
+    def make_extra_day_halfcell(
+        grid_index, day_number, day_size, day_spacing, text_offset, holiday
+    ):
+        """
+        Make a half-day inside another day cell. Used for days that don't fit in the 5 week rows.
+
+        :param grid_index: Index of the day to add. From 0 to 34.
+        :param day_number: Number for the day.
+        :param day_size: Size of the day cell, in px.
+        :param day_spacing: Spacing between cells, in px.
+        """
+        diagonal_spacing = 10
+        current_row = grid_index // 7
+        current_col = grid_index % 7
+
+        x_stride = day_size[0]
+        y_stride = day_size[1]
+
+        cell_left = current_col * x_stride
+        cell_right = (current_col + 1) * x_stride
+        cell_top = current_row * y_stride
+        cell_bottom = (current_row + 1) * y_stride
+
+        start_point = (
+            cell_left + day_spacing + diagonal_spacing,
+            cell_bottom - diagonal_spacing,
+        )
+        end_point = (
+            cell_right - diagonal_spacing,
+            cell_top + day_spacing + diagonal_spacing,
+        )
+
+        out.leaf(
+            "polyline",
+            {"class": "calendar_grid_line", "points": [start_point, end_point]},
+        )
+        out.leaf(
+            "text",
+            {
+                "class": (
+                    "calendar_grid_half_day_text regular-day"
+                    if not holiday
+                    else "calendar_grid_half_day_text holiday"
+                ),
+                "x": cell_right - text_offset[0],
+                "y": cell_bottom - text_offset[1],
+            },
+            day_number,
+        )
+
+    # Make weekday labels
+    for idx, weekday in enumerate(WEEKDAY_NAMES):
+        out.leaf(
+            "text",
+            {
+                "class": "calendar_week_label",
+                "x": day_size[0] * idx,
+                "y": -weekday_label_y_offset,
+            },
+            weekday,
+        )
+
+    def add_day_cell(grid_index, cell_index):
+        make_day_cell(
+            grid_index,
+            cells.days[cell_index],
+            day_size,
+            day_spacing,
+            number_text_offset,
+            cells.month_offsets[cell_index] != 0,
+            cells.flags[cell_index] & MonthCells.HOLIDAY,
+        )
+
+    # Month days in the 5 week rows, the rest are flagged as overflow.
+    month_days = cells.indexes(0)
+    overflow_days = [
+        index for index in month_days if cells.flags[index] & MonthCells.OVERFLOW
+    ]
+    if overflow_days:
+        logging.debug(
+            f"Month did not fit, making cells until day {cells.days[overflow_days[0]] - 1}"
+        )
+
+    # Add month days
+    for grid_index in month_days:
+        if not cells.flags[grid_index] & MonthCells.OVERFLOW:
+            add_day_cell(grid_index, grid_index)
+
+    # Add previous month days
+    for grid_index in cells.indexes(-1):
+        add_day_cell(grid_index, grid_index)
+
+    if not overflow_days:
+        # Add next month days, completing the last week row
+        row_end = month_days.stop + (-month_days.stop % 7)
+        for grid_index in range(month_days.stop, row_end):
+            add_day_cell(grid_index, grid_index)
+    else:
+        # Add missing month days with a diagonal line, over the last week row.
+        for cell_index in overflow_days:
+            make_extra_day_halfcell(
+                cell_index - 7,
+                cells.days[cell_index],
+                day_size,
+                day_spacing,
+                number_text_offset,
+                cells.flags[cell_index] & MonthCells.HOLIDAY,
+            )
+    out.end()
+
+
+def create_month_grid(
+    day_size,
+    current_month,
+    previous_month,
+    next_month,
+):
+    """
+    Create the grid for a full month as a svgwrite group, see emit_month_grid.
+
+    """
+    builder = SvgwriteBackend()
+    emit_month_grid(
+        builder, day_size, MonthCells(current_month, previous_month, next_month)
+    )
+    return builder.root.elements[0]
+
+
+def cached_month_grid(out, day_size, current_month, previous_month, next_month):
+    """
+    Get the grid fragment for a month from grid_fragment_cache, emitting it on a miss.
+
+    Grids are keyed by their shape and by the holidays among the visible days only, so every
+    month with the same layout shares one serialized fragment.
+    """
+    start_index = current_month.start_index
+    n_days = current_month.n_days
+    prev_n_days = previous_month.n_days
+    visible_previous = range(prev_n_days - start_index + 1, prev_n_days + 1)
+    visible_next = range(1, 8 - ((start_index + n_days) % 7))
+    holiday_pattern = (
+        current_month.holidays,
+        frozenset(day for day in visible_previous if day in previous_month.holidays),
+        frozenset(day for day in visible_next if day in next_month.holidays),
+    )
+    key = (out.name, start_index, n_days, prev_n_days, holiday_pattern, tuple(day_size))
+    return grid_fragment_cache.get(
+        key,
+        lambda: out.build_fragment(
+            lambda builder: emit_month_grid(
+                builder,
+                day_size,
+                get_month_cells(
+                    current_month.year, current_month.index, current_month.region
+                ),
+            )
+        ),
+    )
+
+
+class Layout:
+    """
+    Page geometry of a standard, in px unless the name says mm. Immutable.
+
+    Computed once per (standard parameters, stylesheet) by get_layout, and shared by every
+    calendar context, worker process and fragment cache key of that standard.
+    """
+
+    __slots__ = (
+        "page_size_mm",
+        "day_size",
+        "grid_anchor",
+        "month_label_anchor",
+        "month_number_label_anchor",
+        "minimonth_size",
+        "minimonths_anchor",
+        "summary_anchor",
+        "description_anchor",
+        "description_line_offset",
+        "summary_font_size_mm",
+        "description_font_size_mm",
+        "text_max_width",
+        "photo_box",
+        "photo_gap",
+    )
+
+    _computed = {}
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields[name]
+            object.__setattr__(
+                self, name, tuple(value) if isinstance(value, list) else value
+            )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Layout is immutable, cannot set {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Layout is immutable, cannot delete {name}")
+
+    def __eq__(self, other):
+        return isinstance(other, Layout) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Layout({fields})"
+
+    def __reduce__(self):
+        return (Layout.from_dict, (self.to_dict(),))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def get_layout(parameters, style_index, cache_dir=None):
+    """
+    Get the layout of a standard, memoized by parameters and stylesheet.
+
+    :param parameters: Page parameters, e.g. parameters_A3.
+    :param style_index: StyleIndex for the standard.
+    :param cache_dir: Directory for cached layouts. None disables the disk cache.
+    """
+    key = hashlib.sha256(
+        json.dumps(
+            [renderer_digest(), parameters, style_index.text], sort_keys=True
+        ).encode("utf8")
+    ).hexdigest()
+    if key in Layout._computed:
+        return Layout._computed[key]
+    layout = None
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / "layouts" / f"{key}.json"
+        if cache_path.exists():
+            with open(cache_path, "r", encoding="utf8") as file:
+                layout = Layout.from_dict(json.load(file))
+    if layout is None:
+        layout = compute_layout(parameters, style_index)
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w", encoding="utf8") as file:
+                json.dump(layout.to_dict(), file)
+    Layout._computed[key] = layout
+    return layout
+
+
+def stylesheet_path(standard):
+    """
+    Get the stylesheet of a standard: its "stylesheet" parameter, or calendar_<standard>.css.
+    """
+    return STANDARDS[standard].get("stylesheet", f"calendar_{standard}.css")
+
+
+def load_standards_config(config_path):
+    """
+    Register the standards of a JSON config file, by name.
+
+    Each standard sets any page parameter, and takes the others from its "base" standard
+    (default calendar_standard), e.g.
+    {"A4": {"base": "A3", "page_size_mm": [297, 210], "stylesheet": "calendar_A4.css"}}.
+    Stylesheets are relative to the config file, and default to calendar_<name>.css next to it
+    if that file exists, or to the stylesheet of the base standard.
+
+    :return: Names of the standards registered.
+    """
+    config_path = Path(config_path)
+    with open(config_path, "r", encoding="utf8") as file:
+        config = json.load(file)
+    for name, entry in config.items():
+        entry = dict(entry)
+        base = entry.pop("base", calendar_standard)
+        if base not in STANDARDS:
+            raise ValueError(f"{config_path}: unknown base standard {base} for {name}")
+        unknown = set(entry) - set(STANDARDS[base]) - {"stylesheet"}
+        if unknown:
+            raise ValueError(
+                f"{config_path}: unknown parameters for {name}: {', '.join(sorted(unknown))}"
+            )
+        parameters = dict(STANDARDS[base])
+        parameters.update(entry)
+        parameters["page_size_mm"] = tuple(parameters["page_size_mm"])
+        parameters["month_relative_size"] = tuple(parameters["month_relative_size"])
+        if "stylesheet" in entry:
+            parameters["stylesheet"] = str(config_path.parent / entry["stylesheet"])
+        elif (config_path.parent / f"calendar_{name}.css").exists():
+            parameters["stylesheet"] = str(config_path.parent / f"calendar_{name}.css")
+        else:
+            parameters["stylesheet"] = stylesheet_path(base)
+        STANDARDS[name] = parameters
+    return list(config)
+
+
+def register_page_size(width_mm, height_mm, base_standard=calendar_standard):
+    """
+    Register a custom page size as a standard, with the parameters and stylesheet of another.
+
+    :return: Name of the standard, "<width>x<height>".
+    """
+    name = f"{width_mm:g}x{height_mm:g}"
+    if name in STANDARDS and tuple(STANDARDS[name]["page_size_mm"]) == (
+        width_mm,
+        height_mm,
+    ):
+        return name
+    parameters = dict(STANDARDS[base_standard])
+    parameters["page_size_mm"] = (width_mm, height_mm)
+    parameters["stylesheet"] = stylesheet_path(base_standard)
+    STANDARDS[name] = parameters
+    return name
+
+
+def year_argument(text):
+    """
+    Parse a year, see check_year.
+    """
+    try:
+        year = int(text)
+        check_year(year)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return year
+
+
+def page_size_argument(text):
+    """
+    Parse a "<width>x<height>" page size in mm, e.g. "420x297".
+    """
+    try:
+        width, height = (float(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Expected <width>x<height> in mm, e.g. 420x297, got {text}"
+        )
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"Page size must be positive, got {text}")
+    return width, height
+
+
+def compute_layout(parameters, style_index):
+    """
+    Compute the page geometry for a standard, see Layout.
+
+    :param parameters: Page parameters, e.g. parameters_A3.
+    :param style_index: StyleIndex for the standard, used to read font sizes.
+    """
+    mini_font_size_in_mm = style_index.font_size_mm(".mini_calendar_text")
+    font_cell_factors = (1.9, 1.4)
+    miniday_cell_size = (
+        mini_font_size_in_mm * font_cell_factors[0],
+        mini_font_size_in_mm * font_cell_factors[1],
+    )
+    minimonth_size_from_font = (miniday_cell_size[0] * 7, miniday_cell_size[1] * 7)
+    logging.info(
+        f"Minimonth size (mm): {px_to_mm(minimonth_size_from_font[0])} x {px_to_mm(minimonth_size_from_font[1])} (calculated from font size {mini_font_size_in_mm}mm)"
+    )
+
+    # Grid parameters
+    page_size_in_mm = parameters["page_size_mm"]
+    page_size_in_px = (mm_to_px(page_size_in_mm[0]), mm_to_px(page_size_in_mm[1]))
+    month_size_in_mm = (
+        page_size_in_mm[0] * parameters["month_relative_size"][0],
+        page_size_in_mm[1] * parameters["month_relative_size"][1],
+    )
+    month_size_in_px = (
+        mm_to_px(month_size_in_mm[0]),
+        mm_to_px(month_size_in_mm[1]),
+    )
+    content_top_edge_in_mm = parameters["content_top_edge_mm"]
+    content_top_edge = mm_to_px(content_top_edge_in_mm)
+    content_left_edge = (page_size_in_px[0] - month_size_in_px[0]) / 2
+    content_bottom_edge = page_size_in_px[1] - mm_to_px(
+        parameters["content_bottom_edge_mm"]
+    )
+    grid_anchor = (content_left_edge, content_bottom_edge - month_size_in_px[1])
+    content_right_edge = content_left_edge + month_size_in_px[0]
+    day_size = (month_size_in_px[0] / 7, month_size_in_px[1] / 5)
+
+    logging.info(f"Page size (mm): {page_size_in_mm[0]} x {page_size_in_mm[1]}")
+    logging.info(f"Month size (mm): {month_size_in_mm[0]} x {month_size_in_mm[1]}")
+    logging.info(
+        f"Day size (mm): {px_to_mm(day_size[0])} x {px_to_mm(day_size[1])} (calculated from month size)"
+    )
+    logging.info(f"Top edge (mm): {content_top_edge_in_mm}")
+    logging.info(f"Bottom edge (mm): {parameters['content_bottom_edge_mm']}")
+    logging.info(
+        f"Left edge (mm): {px_to_mm(content_left_edge)} (calculated from month and page size)"
+    )
+
+    # Month label parameters
+    calendar_number_label_size_in_mm = style_index.font_size_mm(
+        ".calendar_number_label"
+    )
+    logging.info(
+        f"Calendar number label size (mm): {calendar_number_label_size_in_mm} (from CSS)"
+    )
+    month_number_label_anchor = (
+        content_left_edge,
+        content_top_edge
+        + mm_to_px(calendar_number_label_size_in_mm)
+        + mm_to_px(parameters["month_number_label_margin_mm"]),
+    )
+    month_label_anchor = (
+        content_left_edge,
+        month_number_label_anchor[1]
+        + mm_to_px(parameters["month_labels_vertical_gap_mm"]),
+    )
+
+    # Minimonth parameters
+    minimonth_size_in_mm = minimonth_size_from_font
+    minimonth_size = (
+        mm_to_px(minimonth_size_in_mm[0]),
+        mm_to_px(minimonth_size_in_mm[1]),
+    )
+    logging.info(f"Maximum font size (mm): {minimonth_size_in_mm[1]/7}")
+    mini_calendar_label_font_size_in_mm = style_index.font_size_mm(
+        ".mini_calendar_label"
+    )
+    minimonths_anchor = (
+        content_right_edge - 2 * minimonth_size[0],
+        content_top_edge + mm_to_px(mini_calendar_label_font_size_in_mm),
+    )
+
+    # Descriptive text parameters
+    center_offset = mm_to_px(parameters["center_offset_mm"])
+    summary_anchor = (
+        content_left_edge + month_size_in_px[0] / 2 - center_offset,
+        content_top_edge,
+    )
+    summary_font_size_in_mm = style_index.font_size_mm(".summary_label")
+    description_font_size_in_mm = style_index.font_size_mm(".description_label")
+    description_anchor = (
+        content_left_edge + month_size_in_px[0] / 2 - center_offset,
+        content_top_edge
+        + mm_to_px(
+            summary_font_size_in_mm + parameters["summary_to_description_gap_mm"]
+        ),
+    )
+
+    # Centred text must end before the minimonths, and before the content left edge.
+    text_max_width = 2 * min(
+        minimonths_anchor[0]
+        - mm_to_px(parameters["minimonth_text_gap_mm"])
+        - summary_anchor[0],
+        summary_anchor[0] - content_left_edge,
+    )
+    logging.info(f"Text max width (mm): {px_to_mm(text_max_width)}")
+
+    # Photos are centred over the texts, in the band left above the weekday labels.
+    photo_gap = mm_to_px(parameters["photo_gap_mm"])
+    photo_band_bottom = (
+        grid_anchor[1]
+        - mm_to_px(style_index.font_size_mm(".calendar_week_label"))
+        - photo_gap
+    )
+    photo_box = (
+        summary_anchor[0] - text_max_width / 2,
+        content_top_edge,
+        text_max_width,
+        photo_band_bottom - content_top_edge,
+    )
+    logging.info(
+        f"Photo and text area (mm): {px_to_mm(photo_box[2])} x {px_to_mm(photo_box[3])}"
+    )
+
+    problems = []
+    if content_left_edge < 0:
+        problems.append("the month grid is wider than the page")
+    # The weekday labels start photo_gap below the photo band.
+    if (
+        description_anchor[1] + mm_to_px(description_font_size_in_mm)
+        > photo_band_bottom + photo_gap
+    ):
+        problems.append("the month grid overlaps the texts above it")
+    if text_max_width <= 0:
+        problems.append("the minimonths leave no width for the texts")
+    if minimonths_anchor[1] + minimonth_size[1] > photo_band_bottom + photo_gap:
+        problems.append("the minimonths overlap the month grid")
+    if problems:
+        raise ValueError(
+            f"Page layout does not fit {page_size_in_mm[0]:g} x {page_size_in_mm[1]:g} mm: {', '.join(problems)}"
+        )
+
+    return Layout(
+        page_size_mm=tuple(page_size_in_mm),
+        day_size=day_size,
+        grid_anchor=grid_anchor,
+        month_label_anchor=month_label_anchor,
+        month_number_label_anchor=month_number_label_anchor,
+        minimonth_size=minimonth_size,
+        minimonths_anchor=minimonths_anchor,
+        summary_anchor=summary_anchor,
+        description_anchor=description_anchor,
+        description_line_offset=mm_to_px(parameters["description_line_offset_mm"]),
+        summary_font_size_mm=summary_font_size_in_mm,
+        description_font_size_mm=description_font_size_in_mm,
+        text_max_width=text_max_width,
+        photo_box=photo_box,
+        photo_gap=photo_gap,
+    )
+
+
+def load_photo_texts(photo_text_path):
+    """
+    Load the (summary, description) pair for each month, from alternating lines.
+
+    Missing files and months fall back to DEFAULT_PHOTO_TEXT.
+    """
+    photo_text_data = [DEFAULT_PHOTO_TEXT] * 12
+    photo_text_path = Path(photo_text_path)
+    if photo_text_path.exists():
+        with open(photo_text_path, "r", encoding="utf8") as file:
+            for i in range(12):
+                summary = file.readline()
+                description = file.readline()
+                if not description:
+                    logging.warning(
+                        f"{photo_text_path} has texts for {i} months, using placeholder text for the others"
+                    )
+                    break
+                photo_text_data[i] = [summary, description]
+    return photo_text_data
+
+
+def wrap_description(layout, description):
+    """
+    Break a photo description into the lines drawn on a page.
+
+    :return: (lines, glyph advances). Advances are None without fontTools.
+    """
+    advances = get_glyph_advances(FONT_PATH, layout.description_font_size_mm)
+    if advances is None:
+        return textwrap.wrap(description, width=90), None
+    return wrap_text(description, layout.text_max_width, advances), advances
+
+
+def month_photo_paths(photos_dir):
+    """
+    Find the photo of each month in a directory, by the month number its name starts with,
+    e.g. 01.jpg or 3_volcan.png.
+
+    :return: List of 12 paths, None for months without a photo.
+    """
+    photo_paths = [None] * 12
+    for path in sorted(Path(photos_dir).iterdir()):
+        match = re.match(r"\d+", path.stem)
+        if path.suffix.lower() not in PHOTO_EXTENSIONS or match is None:
+            continue
+        month = int(match.group())
+        if not 1 <= month <= 12:
+            continue
+        if photo_paths[month - 1] is not None:
+            logging.warning(
+                f"Several photos for month {month}, using {photo_paths[month - 1]}"
+            )
+            continue
+        photo_paths[month - 1] = path
+    return photo_paths
+
+
+@functools.lru_cache(maxsize=64)
+def _photo_source(photo_path, mtime_ns):
+    # Hash and upright pixel size of a photo, memoized by path and modification time.
+    # Only the image header is read, the pixels are not decoded.
+    digest = hashlib.sha256(Path(photo_path).read_bytes()).hexdigest()
+    with optional_module("PIL.Image").open(photo_path) as image:
+        size = image.size
+        # EXIF orientations 5 to 8 are rotated by a quarter turn.
+        if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            size = size[::-1]
+    return digest, size
+
+
+def photo_source(photo_path):
+    """
+    Get the (sha256 hex digest, upright size in pixels) of a photo file.
+    """
+    photo_path = Path(photo_path)
+    return _photo_source(str(photo_path.resolve()), photo_path.stat().st_mtime_ns)
+
+
+def caption_height(layout, line_count):
+    """
+    Height of the summary and description texts of a page, in px.
+    """
+    return (
+        layout.description_anchor[1]
+        - layout.summary_anchor[1]
+        + layout.description_line_offset * max(line_count - 1, 0)
+        + mm_to_px(layout.description_font_size_mm)
+    )
+
+
+def fit_photo(layout, source_size, line_count):
+    """
+    Fit a photo above the texts of a page, keeping its aspect ratio.
+
+    :param source_size: Upright size of the photo, in pixels.
+    :param line_count: Number of description lines on the page.
+    :return: (x, y, width, height) in px, or None if the texts leave no room.
+    """
+    box_x, box_y, box_width, box_height = layout.photo_box
+    box_height -= layout.photo_gap + caption_height(layout, line_count)
+    if box_width <= 0 or box_height <= 0:
+        return None
+    scale = min(box_width / source_size[0], box_height / source_size[1])
+    width, height = source_size[0] * scale, source_size[1] * scale
+    return (box_x + (box_width - width) / 2, box_y, width, height)
+
+
+def photo_pixels(frame_size, dpi, source_size):
+    """
+    Pixel size to print a (width, height) px frame at dpi, never above the source size.
+    """
+    pixels = tuple(
+        max(1, round(px_to_mm(length) / 25.4 * dpi)) for length in frame_size
+    )
+    if pixels[0] > source_size[0] or pixels[1] > source_size[1]:
+        return tuple(source_size)
+    return pixels
+
+
+def photo_cache_path(cache_dir, digest, pixels, dpi, image_format):
+    """
+    Path of a resized photo in the cache, keyed by (source hash, pixel size, dpi, format).
+    """
+    key = hashlib.sha256(
+        json.dumps([digest, list(pixels), dpi, image_format]).encode("utf8")
+    ).hexdigest()
+    return Path(cache_dir) / "photos" / f"{key}.{image_format}"
+
+
+def _resize_photo(source_path, pixels, dpi, image_format, output_path):
+    # Decode, downscale and re-encode one photo, in a photo worker process.
+    output_path = Path(output_path)
+    Image = optional_module("PIL.Image")
+    ImageOps = optional_module("PIL.ImageOps")
+    with Image.open(source_path) as image:
+        upright = pixels
+        if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            upright = pixels[::-1]
+        # JPEG sources are decoded straight at the nearest smaller scale.
+        image.draft("RGB", upright)
+        image = ImageOps.exif_transpose(image)
+        if image.size != tuple(pixels):
+            image = image.resize(pixels, Image.Resampling.LANCZOS)
+        if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")
+        temporary = output_path.with_suffix(f".{os.getpid()}.tmp")
+        image.save(temporary, format=image_format, quality=90, dpi=(dpi, dpi))
+    os.replace(temporary, output_path)
+    return output_path
+
+
+def prepare_photos(
+    calendars,
+    photo_paths,
+    dpi,
+    image_format,
+    link,
+    cache_dir,
+    jobs=1,
+    min_size_mm=DEFAULT_PHOTO_MIN_SIZE_MM,
+):
+    """
+    Fit the photo of each month to the pages of every calendar, setting calendar["photos"].
+
+    Photos are downscaled to dpi and re-encoded by a pool of jobs worker processes, and
+    cached in <cache_dir>/photos by (source hash, pixel size, dpi, format). Re-renders, years
+    and standards with the same photo frame never decode the originals again.
+
+    :param photo_paths: List of 12 photo paths, see month_photo_paths.
+    :param image_format: Format of the resized photos, see PHOTO_FORMATS.
+    :param link: Reference the cached photo files instead of embedding them as data URIs.
+    :param min_size_mm: Photos whose frame is smaller on either side are left out, with a
+        warning.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if optional_module("PIL.Image") is None:
+        logging.warning("Pillow is not installed, rendering pages without photos")
+        return
+    pending = {}
+    frames = {}
+    for calendar in calendars.values():
+        layout = calendar["layout"]
+        photos = [None] * 12
+        for month_index, photo_path in enumerate(photo_paths):
+            if photo_path is None:
+                continue
+            description = calendar["photo_texts"][month_index][1]
+            key = (layout, photo_path, description)
+            if key not in frames:
+                digest, source_size = photo_source(photo_path)
+                lines, _ = wrap_description(layout, description)
+                frame = fit_photo(layout, source_size, len(lines))
+                if frame is None:
+                    logging.warning(
+                        f"No room for {photo_path} on {calendar['standard']} pages, leaving it out"
+                    )
+                    frames[key] = None
+                    continue
+                if min(frame[2:]) < mm_to_px(min_size_mm):
+                    logging.warning(
+                        f"Photo frame for {photo_path} on {calendar['standard']} pages is {px_to_mm(frame[2]):.1f} x {px_to_mm(frame[3]):.1f} mm, below the {min_size_mm} mm minimum, leaving it out"
+                    )
+                    frames[key] = None
+                    continue
+                pixels = photo_pixels(frame[2:], dpi, source_size)
+                cache_path = photo_cache_path(
+                    cache_dir, digest, pixels, dpi, image_format
+                )
+                if not cache_path.exists():
+                    pending[cache_path] = (
+                        str(photo_path),
+                        pixels,
+                        dpi,
+                        image_format,
+                        cache_path,
+                    )
+                frames[key] = (frame, cache_path)
+            if frames[key] is not None:
+                photos[month_index] = frames[key]
+        calendar["photos"] = photos
+
+    start = time.perf_counter()
+    if pending:
+        (Path(cache_dir) / "photos").mkdir(parents=True, exist_ok=True)
+        jobs = min(jobs if jobs > 0 else os.cpu_count(), len(pending))
+        if jobs <= 1:
+            for task in pending.values():
+                _resize_photo(*task)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(_resize_photo, *zip(*pending.values())))
+    cached = len({cache_path for _, cache_path in filter(None, frames.values())})
+    logging.info(
+        f"Photos resized: {len(pending)} in {time.perf_counter() - start:.3f} s, reused: {cached - len(pending)}"
+    )
+
+    # Entries are (href, frame, fingerprint), see add_page_content and page_fingerprint.
+    hrefs = {}
+    for calendar in calendars.values():
+        photos = calendar["photos"]
+        for month_index, entry in enumerate(photos):
+            if entry is None:
+                continue
+            frame, cache_path = entry
+            if cache_path not in hrefs:
+                if link:
+                    hrefs[cache_path] = cache_path.resolve().as_uri()
+                else:
+                    hrefs[cache_path] = base64_data(
+                        cache_path.read_bytes(), PHOTO_FORMATS[image_format]
+                    )
+            fingerprint = hrefs[cache_path] if link else cache_path.name
+            photos[month_index] = (hrefs[cache_path], frame, fingerprint)
+        calendar["photos"] = tuple(photos)
+
+
+def add_page_content(out, calendar, month_index, background_size, use_symbols=False):
+    """
+    Emit the elements of a month page to an output backend.
+
+    :param out: Output backend, SvgwriteBackend or SVGStreamWriter.
+    :param calendar: Calendar context, as built by build_calendar_context.
+    :param month_index: Index of the month to render. From 0 to 11.
+    :param background_size: Size of the background rect.
+    :param use_symbols: Reference minimonths emitted as symbols, see emit_minimonth_symbols.
+    """
+    layout = calendar["layout"]
+    previous_year, current_year, next_year = calendar["years"]
+    photo_text_data = calendar["photo_texts"]
+    year = current_year.year
+
+    out.leaf(
+        "rect",
+        {
+            "fill": "#efeeea",
+            "x": 0,
+            "y": 0,
+            "width": background_size[0],
+            "height": background_size[1],
+        },
+    )
+
+    # Add minimonths
+    with profiler.stage("minimonths"):
+        emit_minimonth_pair(
+            out,
+            layout.minimonth_size,
+            month_index,
+            current_year,
+            previous_year,
+            next_year,
+            {"transform": translate(*layout.minimonths_anchor)},
+            use_symbols,
+        )
+
+    # Add main grid
+    logging.info(f"Creating grid for month {month_index}")
+
+    previous_month_data = (
+        MonthData(current_year, month_index - 1)
+        if month_index != 0
+        else MonthData(previous_year, 11)
+    )
+    current_month_data = MonthData(current_year, month_index)
+    next_month_data = (
+        MonthData(current_year, month_index + 1)
+        if month_index != 11
+        else MonthData(next_year, 0)
+    )
+
+    with profiler.stage("grid"):
+        grid_fragment = cached_month_grid(
+            out,
+            layout.day_size,
+            current_month_data,
+            previous_month_data,
+            next_month_data,
+        )
+        out.fragment(grid_fragment, {"transform": translate(*layout.grid_anchor)})
+
+    # Add month labels
+    month_label_anchor = layout.month_label_anchor
+    month_number_label_anchor = layout.month_number_label_anchor
+    with profiler.stage("labels"):
+        out.leaf(
+            "text",
+            {
+                "class": "calendar_label",
+                "x": month_label_anchor[0],
+                "y": month_label_anchor[1],
+            },
+            current_year.month_names(month_index),
+        )
+        out.leaf(
+            "text",
+            {
+                "class": "calendar_number_label",
+                "x": month_number_label_anchor[0],
+                "y": month_number_label_anchor[1],
+            },
+            f"{(month_index+1):02} / {year}",
+        )
+
+    # Add the photo, with its texts below it.
+    photo = calendar["photos"][month_index] if calendar["photos"] else None
+    caption_offset = 0
+    if photo is not None:
+        href, frame, _ = photo
+        with profiler.stage("photo"):
+            out.leaf(
+                "image",
+                {
+                    "xlink:href": href,
+                    "x": frame[0],
+                    "y": frame[1],
+                    "width": frame[2],
+                    "height": frame[3],
+                },
+            )
+        caption_offset = frame[3] + layout.photo_gap
+
+    # Add photo summary and description text at center.
+    summary_anchor = layout.summary_anchor
+    description_anchor = layout.description_anchor
+    text_max_width = layout.text_max_width
+    with profiler.stage("description_wrap"):
+        wrapped_text, description_advances = wrap_description(
+            layout, photo_text_data[month_index][1]
+        )
+        line_offset = layout.description_line_offset
+        for idx, line in enumerate(wrapped_text):
+            attribs = {
+                "class": "description_label",
+                "x": description_anchor[0],
+                "y": description_anchor[1] + caption_offset + line_offset * idx,
+            }
+            if description_advances is not None:
+                style = fit_font_size(
+                    line,
+                    text_max_width,
+                    description_advances,
+                    layout.description_font_size_mm,
+                )
+                if style is not None:
+                    attribs["style"] = style
+            out.leaf("text", attribs, line)
+    with profiler.stage("labels"):
+        summary = photo_text_data[month_index][0]
+        attribs = {
+            "class": "summary_label",
+            "x": summary_anchor[0],
+            "y": summary_anchor[1] + caption_offset,
+        }
+        summary_advances = get_glyph_advances(FONT_PATH, layout.summary_font_size_mm)
+        if summary_advances is not None:
+            style = fit_font_size(
+                summary,
+                text_max_width,
+                summary_advances,
+                layout.summary_font_size_mm,
+            )
+            if style is not None:
+                attribs["style"] = style
+        out.leaf("text", attribs, summary)
+
+
+def begin_calendar_document(calendar, fileobj, backend="svgwrite", page_count=1):
+    """
+    Start a document of page_count stacked pages, with the font and stylesheet of a calendar.
+
+    :return: Output backend, with its defs still open.
+    """
+    out = BACKENDS[backend]()
+    if calendar["compact_precision"] is not None:
+        out = CompactBackend(
+            out, calendar["compact_precision"], class_aliases(calendar["stylesheet"])
+        )
+    page_size_in_mm = calendar["layout"].page_size_mm
+    page_size_in_px = (mm_to_px(page_size_in_mm[0]), mm_to_px(page_size_in_mm[1]))
+    viewbox = (
+        (0, 0, page_size_in_px[0], page_size_in_px[1] * page_count)
+        if page_count > 1
+        else None
+    )
+    out.begin_document(
+        fileobj,
+        (f"{page_size_in_mm[0]}mm", f"{page_size_in_mm[1] * page_count}mm"),
+        viewbox,
+    )
+    out.begin_defs()
+    out.style(FONT_TEMPLATE.format(name=FONT_NAME, data=calendar["font_data"]))
+    out.style(calendar["stylesheet"])
+    return out
+
+
+def write_document(calendar, month_indexes, fileobj, backend="svgwrite"):
+    """
+    Write the pages of a calendar as a SVG document.
+
+    A single month is written as a plain page. Several months are stacked vertically as pages
+    of a single document, where minimonths shown on more than one page are defined once as
+    symbols.
+
+    :param calendar: Calendar context, as built by build_calendar_context.
+    :param month_indexes: Indexes of the months to render, in page order.
+    :param fileobj: Text file object to write to.
+    :param backend: Name of the output backend, see BACKENDS.
+    :return: Number of SVG elements written.
+    """
+    layout = calendar["layout"]
+    page_size_in_mm = layout.page_size_mm
+    page_count = len(month_indexes)
+    combined = page_count > 1
+    page_size_in_px = (mm_to_px(page_size_in_mm[0]), mm_to_px(page_size_in_mm[1]))
+    out = begin_calendar_document(calendar, fileobj, backend, page_count)
+    if combined:
+        with profiler.stage("minimonths"):
+            emit_minimonth_symbols(
+                out, layout.minimonth_size, month_indexes, calendar["years"], set()
+            )
+    out.end_defs()
+
+    if not combined:
+        add_page_content(out, calendar, month_indexes[0], ("100%", "100%"))
+    else:
+        for page_number, month_index in enumerate(month_indexes):
+            out.start(
+                "g",
+                {
+                    "class": "calendar_page",
+                    "transform": translate(0, page_size_in_px[1] * page_number),
+                },
+            )
+            add_page_content(out, calendar, month_index, page_size_in_px, True)
+            out.end()
+    with profiler.stage("save"):
+        out.close()
+    return out.element_count
+
+
+def render_page(calendar, month_index, output_path, backend="svgwrite"):
+    """
+    Render and save a single month page.
+
+    :param calendar: Calendar context, as built by build_calendar_context.
+    :param month_index: Index of the month to render. From 0 to 11.
+    :param output_path: Path of the SVG file to write.
+    :param backend: Name of the output backend, see BACKENDS.
+    """
+    with open(output_path, "w", encoding="utf-8") as file:
+        write_document(calendar, [month_index], file, backend)
+
+
+def render_combined(calendar, month_indexes, output_path, backend="svgwrite"):
+    """
+    Render several month pages stacked vertically in a single document.
+
+    :param month_indexes: Indexes of the months to render, in page order.
+    """
+    with open(output_path, "w", encoding="utf-8") as file:
+        write_document(calendar, month_indexes, file, backend)
+
+
+PLANNER_HOURS = range(8, 21)
+PLANNER_LINE_SPACING_MM = 8
+
+planner_fragment_cache = FragmentCache("planner", maxsize=16)
+
+
+def planner_weeks(year):
+    """
+    Lazily yield the Monday of every week with days in year, from the week of January 1st.
+    """
+    monday = datetime.date(year, 1, 1)
+    monday -= datetime.timedelta(days=monday.weekday())
+    while monday.year <= year:
+        yield monday
+        monday += datetime.timedelta(days=7)
+
+
+def planner_days(year):
+    """
+    Lazily yield every date of year.
+    """
+    day = datetime.date(year, 1, 1)
+    while day.year == year:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+PLANNER_MODES = {"week": planner_weeks, "day": planner_days}
+
+
+def day_flags(calendar, date):
+    """
+    Get the MonthCells flags of a date, e.g. MonthCells.HOLIDAY.
+    """
+    cells = get_month_cells(date.year, date.month - 1, calendar["years"][1].region)
+    return cells.flags[cells.start_index + date.day - 1]
+
+
+def emit_week_body(out, day_size):
+    """
+    Emit the day columns and writing lines of a weekly planner page, the same on every page.
+    """
+    day_spacing = mm_to_px(1)
+    line_spacing = mm_to_px(PLANNER_LINE_SPACING_MM)
+    height = day_size[1] * 5
+    out.start("g", {"class": "calendar_grid"})
+    for idx, weekday in enumerate(WEEKDAY_NAMES):
+        out.leaf(
+            "text",
+            {"class": "calendar_week_label", "x": day_size[0] * idx, "y": -day_spacing},
+            weekday,
+        )
+    for column in range(7):
+        left = column * day_size[0]
+        right = left + day_size[0]
+        out.leaf(
+            "polyline",
+            {
+                "class": "calendar_grid_line",
+                "points": [
+                    (left + day_spacing, height),
+                    (right, height),
+                    (right, day_spacing),
+                ],
+            },
+        )
+        # The first line leaves room for the day number.
+        line_y = 2 * line_spacing
+        while line_y < height - day_spacing:
+            out.leaf(
+                "polyline",
+                {
+                    "class": "calendar_grid_line",
+                    "points": [
+                        (left + 2 * day_spacing, line_y),
+                        (right - day_spacing, line_y),
+                    ],
+                },
+            )
+            line_y += line_spacing
+    out.end()
+
+
+def emit_day_body(out, day_size):
+    """
+    Emit the hour rows of a daily planner page, the same on every page.
+    """
+    width = day_size[0] * 7
+    row_height = day_size[1] * 5 / len(PLANNER_HOURS)
+    text_offset = mm_to_px(2)
+    out.start("g", {"class": "calendar_grid"})
+    for row, hour in enumerate(PLANNER_HOURS):
+        row_top = row * row_height
+        out.leaf(
+            "polyline",
+            {
+                "class": "calendar_grid_line",
+                "points": [(0, row_top + row_height), (width, row_top + row_height)],
+            },
+        )
+        out.leaf(
+            "text",
+            {
+                "class": "calendar_grid_text regular-day",
+                "x": text_offset,
+                "y": row_top + text_offset,
+            },
+            hour,
+        )
+    out.end()
+
+
+PLANNER_BODIES = {"week": emit_week_body, "day": emit_day_body}
+
+
+def cached_planner_body(out, mode, day_size):
+    """
+    Get the body fragment of a planner mode from planner_fragment_cache, emitting it on a miss.
+    """
+    return planner_fragment_cache.get(
+        (out.name, mode, tuple(day_size)),
+        lambda: out.build_fragment(
+            lambda builder: PLANNER_BODIES[mode](builder, day_size)
+        ),
+    )
+
+
+def add_planner_page_content(out, calendar, mode, number, first_day):
+    """
+    Emit the elements of a planner page to an output backend.
+
+    :param mode: "week" or "day", see PLANNER_MODES.
+    :param number: Page number, from 1.
+    :param first_day: Date of the day, or Monday of the week, of the page.
+    """
+    layout = calendar["layout"]
+    years = calendar["years"]
+    year = years[1].year
+
+    out.leaf(
+        "rect",
+        {"fill": "#efeeea", "x": 0, "y": 0, "width": "100%", "height": "100%"},
+    )
+
+    # Add minimonths for the month of the page and the next one.
+    month_index = (first_day.year - year) * 12 + first_day.month - 1
+    with profiler.stage("minimonths"):
+        out.start("g", {"transform": translate(*layout.minimonths_anchor)})
+        for position, mini_index in enumerate((month_index, month_index + 1)):
+            mini_data = relative_month_data(years, mini_index)
+            out.fragment(
+                cached_minimonth(
+                    out,
+                    layout.minimonth_size,
+                    f"{YearData.month_names(mini_data.index)} {mini_data.year}",
+                    mini_data,
+                    relative_month_data(years, mini_index - 1),
+                    relative_month_data(years, mini_index + 1),
+                ),
+                {"transform": translate(layout.minimonth_size[0])} if position else {},
+            )
+        out.end()
+
+    with profiler.stage("grid"):
+        out.fragment(
+            cached_planner_body(out, mode, layout.day_size),
+            {"transform": translate(*layout.grid_anchor)},
+        )
+
+    label_classes = ["calendar_label"]
+    if mode == "week":
+        text_offset = mm_to_px(2)
+        days = [first_day + datetime.timedelta(days=offset) for offset in range(7)]
+        for column, day in enumerate(days):
+            holiday = day_flags(calendar, day) & MonthCells.HOLIDAY
+            out.leaf(
+                "text",
+                {
+                    "class": " ".join(
+                        ["calendar_grid_text"]
+                        + (["off-day"] if day.year != year else [])
+                        + (["holiday"] if holiday else ["regular-day"])
+                    ),
+                    "x": layout.grid_anchor[0]
+                    + column * layout.day_size[0]
+                    + text_offset,
+                    "y": layout.grid_anchor[1] + text_offset,
+                },
+                day.day,
+            )
+        label = " / ".join(
+            dict.fromkeys(YearData.month_names(day.month - 1) for day in days)
+        )
+        number_label = f"Semana {number:02} / {year}"
+    else:
+        if day_flags(calendar, first_day) & MonthCells.HOLIDAY:
+            label_classes.append("holiday")
+        label = f"{WEEKDAY_NAMES[first_day.weekday()]} {first_day.day}"
+        number_label = f"{first_day.month:02} / {year}"
+
+    month_label_anchor = layout.month_label_anchor
+    month_number_label_anchor = layout.month_number_label_anchor
+    with profiler.stage("labels"):
+        out.leaf(
+            "text",
+            {
+                "class": " ".join(label_classes),
+                "x": month_label_anchor[0],
+                "y": month_label_anchor[1],
+            },
+            label,
+        )
+        out.leaf(
+            "text",
+            {
+                "class": "calendar_number_label",
+                "x": month_number_label_anchor[0],
+                "y": month_number_label_anchor[1],
+            },
+            number_label,
+        )
+
+
+def write_planner_page(calendar, mode, number, first_day, fileobj, backend="svgwrite"):
+    """
+    Write a planner page as a SVG document, see add_planner_page_content.
+
+    :return: Number of SVG elements written.
+    """
+    out = begin_calendar_document(calendar, fileobj, backend)
+    out.end_defs()
+    add_planner_page_content(out, calendar, mode, number, first_day)
+    with profiler.stage("save"):
+        out.close()
+    return out.element_count
+
+
+def render_planner(
+    calendar, mode, prefix=Path(), backend="svgwrite", start=0, stop=None
+):
+    """
+    Render the pages of a planner one at a time, as their dates are pulled from a generator.
+
+    Only the page being rendered is held in memory, so memory stays flat with the page count.
+
+    :param mode: "week" (53 or 54 pages) or "day" (365 or 366 pages), see PLANNER_MODES.
+    :param prefix: Directory of the page names in the output sink.
+    :param start: Index of the first page to render, to split pages between processes.
+    :param stop: Index after the last page to render. None renders to the end.
+    :return: Generator of (output name, document bytes, seconds) for each page.
+    """
+    pages = enumerate(PLANNER_MODES[mode](calendar["years"][1].year), 1)
+    for number, first_day in itertools.islice(pages, start, stop):
+        page_start = time.perf_counter()
+        buffer = io.StringIO()
+        write_planner_page(calendar, mode, number, first_day, buffer, backend)
+        yield (
+            Path(prefix) / f"planner_{mode}_{number:03}.svg",
+            buffer.getvalue().encode("utf-8"),
+            time.perf_counter() - page_start,
+        )
+
+
+def build_calendar_context(
+    year,
+    standard,
+    stylesheets,
+    photo_texts,
+    font_data,
+    cache_dir=None,
+    region=DEFAULT_HOLIDAY_REGION,
+    compact_precision=None,
+    photos=None,
+):
+    """
+    Gather everything a worker needs to render the pages of one calendar.
+
+    :param stylesheets: Cache of (StyleIndex, layout) pairs, by standard.
+    :param cache_dir: Directory for cached build artifacts.
+    :param compact_precision: Decimals kept by CompactBackend. None writes full documents.
+    :param photos: 12 (href, frame, fingerprint) entries or None, see prepare_photos. None
+        renders pages without photos.
+    """
+    check_year(year)
+    if standard not in stylesheets:
+        style_index = StyleIndex.load(stylesheet_path(standard), cache_dir)
+        stylesheets[standard] = (
+            style_index,
+            get_layout(STANDARDS[standard], style_index, cache_dir),
+        )
+    style_index, layout = stylesheets[standard]
+
+    return {
+        "standard": standard,
+        "stylesheet": style_index.text,
+        "layout": layout,
+        "years": (
+            get_year_data(year - 1, region),
+            get_year_data(year, region),
+            get_year_data(year + 1, region),
+        ),
+        "photo_texts": photo_texts,
+        "font_data": font_data,
+        "stylesheet_digest": hashlib.sha256(
+            style_index.text.encode("utf8")
+        ).hexdigest(),
+        "font_digest": hashlib.sha256(font_data.encode("ascii")).hexdigest(),
+        "compact_precision": compact_precision,
+        "photos": photos,
+    }
+
+
+# Parsed stylesheets and layouts shared by every render_month and render_year call.
+_api_stylesheets = {}
+
+
+@functools.lru_cache(maxsize=16)
+def _api_font_data(characters, cache_dir):
+    return load_font_data_uri(FONT_PATH, characters, cache_dir)
+
+
+@functools.lru_cache(maxsize=64)
+def _api_calendar(year, standard, photo_texts, region, cache_dir):
+    font_data = _api_font_data(collect_font_characters(photo_texts), cache_dir)
+    return build_calendar_context(
+        year,
+        standard,
+        _api_stylesheets,
+        [list(pair) for pair in photo_texts],
+        font_data,
+        cache_dir,
+        region,
+    )
+
+
+def get_calendar(
+    year,
+    standard=calendar_standard,
+    texts=None,
+    region=DEFAULT_HOLIDAY_REGION,
+    cache_dir=DEFAULT_CACHE_DIR,
+):
+    """
+    Get a calendar context, memoized so repeated calls reuse stylesheets, fonts and year data.
+
+    :param texts: List of 12 (summary, description) pairs. Defaults to PHOTO_TEXT_PATH.
+    """
+    if standard not in STANDARDS:
+        raise ValueError(
+            f"Unknown standard {standard}, expected one of {sorted(STANDARDS)}"
+        )
+    if texts is None:
+        texts = load_photo_texts(PHOTO_TEXT_PATH)
+    photo_texts = tuple(
+        (str(summary), str(description)) for summary, description in texts
+    )
+    if len(photo_texts) != 12:
+        raise ValueError(
+            f"Expected 12 (summary, description) pairs, got {len(photo_texts)}"
+        )
+    return _api_calendar(year, standard, photo_texts, region, cache_dir)
+
+
+def render_document(calendar, month_indexes, backend=SvgwriteBackend.name):
+    """
+    Render pages of a calendar context to SVG bytes, see write_document.
+    """
+    buffer = io.StringIO()
+    write_document(calendar, month_indexes, buffer, backend)
+    return buffer.getvalue().encode("utf-8")
+
+
+def render_month(
+    year,
+    month,
+    standard=calendar_standard,
+    texts=None,
+    region=DEFAULT_HOLIDAY_REGION,
+    backend=SvgwriteBackend.name,
+    cache_dir=DEFAULT_CACHE_DIR,
+):
+    """
+    Render one month page in memory.
+
+    :param month: Month to render, from 1 to 12.
+    :param texts: List of 12 (summary, description) pairs. Defaults to PHOTO_TEXT_PATH.
+    :return: SVG document, as UTF-8 bytes.
+    """
+    if not 1 <= month <= 12:
+        raise ValueError(f"Month must be from 1 to 12, got {month}")
+    calendar = get_calendar(year, standard, texts, region, cache_dir)
+    return render_document(calendar, [month - 1], backend)
+
+
+def render_year(
+    year,
+    standard=calendar_standard,
+    texts=None,
+    region=DEFAULT_HOLIDAY_REGION,
+    backend=SvgwriteBackend.name,
+    cache_dir=DEFAULT_CACHE_DIR,
+    months=range(1, 13),
+):
+    """
+    Render the pages of a year in memory, one at a time as they are consumed.
+
+    :param months: Months to render, from 1 to 12.
+    :return: Generator of (month, SVG bytes) pairs.
+    """
+    calendar = get_calendar(year, standard, texts, region, cache_dir)
+    for month in months:
+        if not 1 <= month <= 12:
+            raise ValueError(f"Month must be from 1 to 12, got {month}")
+        yield month, render_document(calendar, [month - 1], backend)
+
+
+@functools.lru_cache(maxsize=None)
+def renderer_digest():
+    """
+    Hash of this module's source, so page fingerprints change with the rendering code.
+    """
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def page_fingerprint(calendar, month_indexes):
+    """
+    Fingerprint of every input that affects a page (or combined document).
+
+    It covers the renderer, layout, stylesheet and font, the data of the months shown on the
+    page (the big month, its neighbours and the minimonths' neighbours), the photo texts and
+    the photos.
+    """
+    month_data = []
+    for month_index in month_indexes:
+        for offset in range(-2, 3):
+            month = relative_month_data(calendar["years"], month_index + offset)
+            month_data.append(
+                [
+                    month.year,
+                    month.index,
+                    month.n_days,
+                    month.start_index,
+                    sorted(month.holidays),
+                ]
+            )
+        month_data.append(list(calendar["photo_texts"][month_index]))
+        photo = calendar["photos"][month_index] if calendar["photos"] else None
+        month_data.append(None if photo is None else [photo[1], photo[2]])
+    inputs = {
+        "renderer": renderer_digest(),
+        "layout": calendar["layout"].to_dict(),
+        "stylesheet": calendar["stylesheet_digest"],
+        "compact": calendar["compact_precision"],
+        "font": calendar["font_digest"],
+        "year": calendar["years"][1].year,
+        "months": list(month_indexes),
+        "month_data": month_data,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf8")).hexdigest()
+
+
+class PageCache:
+    """
+    Content-addressed store of rendered pages, keyed by page fingerprint.
+
+    A manifest records the fingerprint of every output file written, so up-to-date outputs are
+    skipped and outputs whose fingerprint is in the store are loaded instead of re-rendered.
+    The least recently used pages are deleted when the store grows above max_size bytes.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_PAGE_CACHE_SIZE_MB * 1024 * 1024):
+        self.max_size = max_size
+        self.store_dir = Path(cache_dir) / "pages"
+        self.manifest_path = Path(cache_dir) / "outputs.json"
+        self.outputs = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r", encoding="utf8") as file:
+                self.outputs = json.load(file)
+
+    def artifact_path(self, fingerprint):
+        return self.store_dir / f"{fingerprint}.svg"
+
+    def is_current(self, output_path, fingerprint):
+        output_path = Path(output_path)
+        return (
+            output_path.exists()
+            and self.outputs.get(str(output_path.resolve())) == fingerprint
+        )
+
+    def load(self, fingerprint):
+        """
+        Get a stored page, or None if the fingerprint is not stored.
+        """
+        artifact = self.artifact_path(fingerprint)
+        try:
+            data = artifact.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(artifact)
+        return data
+
+    def record(self, output_path, fingerprint):
+        """
+        Record the fingerprint of an output file. Outputs without a file are not tracked.
+        """
+        if output_path is not None:
+            self.outputs[str(Path(output_path).resolve())] = fingerprint
+
+    def store(self, output_path, fingerprint, data):
+        """
+        Add a freshly rendered page to the store.
+        """
+        if self.max_size <= 0:
+            self.record(output_path, fingerprint)
+            return
+        artifact = self.artifact_path(fingerprint)
+        if not artifact.exists():
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            temporary = artifact.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_bytes(data)
+            os.replace(temporary, artifact)
+        self.record(output_path, fingerprint)
+
+    def prune(self):
+        """
+        Delete the least recently used stored pages until the store fits in max_size bytes.
+        """
+        if not self.store_dir.is_dir():
+            return
+        artifacts = []
+        total = 0
+        for entry in os.scandir(self.store_dir):
+            if entry.name.endswith(".svg"):
+                stat = entry.stat()
+                artifacts.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(artifacts):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            logging.info(
+                f"Page cache: removed {removed} stored pages, {total} bytes left"
+            )
+
+    def save(self):
+        """
+        Write the manifest and prune the store.
+        """
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf8") as file:
+            json.dump(self.outputs, file, indent=1, sort_keys=True)
+        self.prune()
+
+
+class DirectorySink:
+    """
+    Output sink writing each document as a file under a directory.
+    """
+
+    name = "dir"
+    resumable = True
+    writes_stdout = False
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directories = set()
+
+    def path(self, name):
+        """
+        Get the file a document is written to. None for sinks without files.
+        """
+        return self.directory / name
+
+    def write(self, name, data):
+        path = self.directory / name
+        if path.parent not in self.directories:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.directories.add(path.parent)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _StreamSink:
+    # Base of the sinks writing a single stream, to a file or to stdout for "-".
+
+    name = None
+    resumable = False
+
+    def __init__(self, target="-"):
+        self.target = str(target)
+        self.writes_stdout = self.target == "-"
+        if self.writes_stdout:
+            self.fileobj = sys.stdout.buffer
+        else:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self.fileobj = open(target, "wb")
+
+    def path(self, name):
+        return None
+
+    def flush(self):
+        self.fileobj.flush()
+
+    def close(self):
+        if self.writes_stdout:
+            self.fileobj.flush()
+        else:
+            self.fileobj.close()
+
+
+class StdoutSink(_StreamSink):
+    """
+    Output sink writing the documents one after the other to stdout.
+    """
+
+    name = "stdout"
+
+    def write(self, name, data):
+        self.fileobj.write(data)
+
+
+class ZipSink(_StreamSink):
+    """
+    Output sink adding each document to a ZIP archive as it completes. Works on pipes too.
+    """
+
+    name = "zip"
+
+    def __init__(self, target="-"):
+        import zipfile
+
+        super().__init__(target)
+        self.archive = zipfile.ZipFile(self.fileobj, "w", zipfile.ZIP_DEFLATED)
+
+    def write(self, name, data):
+        self.archive.writestr(name, data)
+
+    def close(self):
+        self.archive.close()
+        super().close()
+
+
+class TarSink(_StreamSink):
+    """
+    Output sink streaming each document into a tar archive as it completes.
+    """
+
+    name = "tar"
+    compression = ""
+
+    def __init__(self, target="-"):
+        import tarfile
+
+        super().__init__(target)
+        self.archive = tarfile.open(fileobj=self.fileobj, mode=f"w|{self.compression}")
+
+    def write(self, name, data):
+        info = self.archive.tarinfo(str(name))
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+        super().close()
+
+
+class TarGzSink(TarSink):
+    name = "tar.gz"
+    compression = "gz"
+
+
+class MemorySink:
+    """
+    Output sink keeping the documents in memory, by name.
+    """
+
+    name = "memory"
+    resumable = False
+    writes_stdout = False
+
+    def __init__(self):
+        self.documents = {}
+
+    def path(self, name):
+        return None
+
+    def write(self, name, data):
+        self.documents[str(name)] = data
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+SINKS = {
+    sink.name: sink
+    for sink in (DirectorySink, ZipSink, TarSink, TarGzSink, StdoutSink, MemorySink)
+}
+ARCHIVE_SINKS = {ZipSink.name, TarSink.name, TarGzSink.name}
+
+
+def sink_argument(text):
+    """
+    Parse an output sink: dir, zip[:PATH], tar[:PATH], tar.gz[:PATH], stdout or memory.
+    """
+    kind, _, path = text.partition(":")
+    if kind not in SINKS:
+        raise argparse.ArgumentTypeError(
+            f"Unknown sink {kind}, expected one of {', '.join(SINKS)}"
+        )
+    if path and kind not in ARCHIVE_SINKS:
+        raise argparse.ArgumentTypeError(f"The {kind} sink takes no path")
+    return kind, path or None
+
+
+def open_sink(kind, path=None, output_dir=Path(".")):
+    """
+    Open an output sink, see SINKS.
+
+    :param path: Archive path, "-" for stdout. Defaults to <output_dir>/pages.<kind>.
+    :param output_dir: Directory of the dir sink and of default archive paths.
+    """
+    if kind == DirectorySink.name:
+        return DirectorySink(output_dir)
+    if kind in ARCHIVE_SINKS:
+        return SINKS[kind](path or Path(output_dir) / f"pages.{kind}")
+    return SINKS[kind]()
+
+
+class SinkWriter:
+    """
+    Write documents to an output sink from a background thread, so rendering never waits on
+    disk or pipe I/O.
+
+    Documents queued while the thread is busy are written as one batch, and the sink is
+    flushed once per batch. The queue is bounded, so a slow sink holds rendering back instead
+    of filling memory. Errors are raised on the next write or on close.
+    """
+
+    def __init__(self, sink, max_pending=64):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.documents = 0
+        self.size = 0
+        self.thread = threading.Thread(
+            target=self._run, name="sink-writer", daemon=True
+        )
+        self.thread.start()
+
+    def write(self, name, data):
+        """
+        :param name: Relative output path, as a string or Path.
+        """
+        self._raise_error()
+        self.queue.put((Path(name).as_posix(), data))
+
+    def after(self, callback, flush=True):
+        """
+        Call callback from the writer thread once every document queued before is written.
+
+        :param flush: Flush the sink before calling callback.
+        """
+        self._raise_error()
+        self.queue.put((flush, callback))
+
+    def close(self):
+        """
+        Wait for the queued documents to be written. Does not close the sink.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        logging.info(
+            f"Wrote {self.documents} documents ({self.size} bytes) to the {self.sink.name} sink"
+        )
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    self._flush()
+                    return
+                if self.error is not None:
+                    continue
+                name, data = item
+                try:
+                    if callable(data):
+                        if name:
+                            self.sink.flush()
+                        data()
+                    else:
+                        self.sink.write(name, data)
+                        self.documents += 1
+                        self.size += len(data)
+                except Exception as error:
+                    self.error = error
+            self._flush()
+
+    def _flush(self):
+        if self.error is None:
+            try:
+                self.sink.flush()
+            except Exception as error:
+                self.error = error
+
+
+class _ByteCounter:
+    # Text file object counting the UTF-8 bytes written to it.
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text.encode("utf-8"))
+
+
+def document_size(calendar, month_indexes):
+    """
+    Get the size in bytes of a document, without keeping it.
+    """
+    counter = _ByteCounter()
+    write_document(calendar, month_indexes, counter, SVGStreamWriter.name)
+    return counter.size
+
+
+def _rsvg_convert_command(svg_path, output_path, image_format, dpi):
+    return [
+        "rsvg-convert",
+        "--format",
+        image_format,
+        "--dpi-x",
+        str(dpi),
+        "--dpi-y",
+        str(dpi),
+        "--output",
+        str(output_path),
+        str(svg_path),
+    ]
+
+
+def _inkscape_command(svg_path, output_path, image_format, dpi):
+    return [
+        "inkscape",
+        str(svg_path),
+        "--export-type",
+        image_format,
+        "--export-dpi",
+        str(dpi),
+        "--export-filename",
+        str(output_path),
+    ]
+
+
+def _cairosvg_export(svg_path, output_path, image_format, dpi):
+    cairosvg = optional_module("cairosvg")
+    convert = cairosvg.svg2pdf if image_format == "pdf" else cairosvg.svg2png
+    convert(url=str(svg_path), write_to=str(output_path), dpi=dpi)
+
+
+# Local SVG renderers for --export, by preference. Command renderers build the command line
+# of an executable with the same name, others convert in process.
+RENDERERS = {
+    "rsvg-convert": _rsvg_convert_command,
+    "inkscape": _inkscape_command,
+    "cairosvg": _cairosvg_export,
+}
+COMMAND_RENDERERS = {"rsvg-convert", "inkscape"}
+EXPORT_FORMATS = ("pdf", "png")
+EXPORT_TIMEOUT = 300
+
+
+def renderer_available(renderer):
+    if renderer in COMMAND_RENDERERS:
+        return shutil.which(renderer) is not None
+    return optional_module("cairosvg") is not None
+
+
+def default_renderer():
+    """
+    Get the first available renderer of RENDERERS, or None.
+    """
+    for renderer in RENDERERS:
+        if renderer_available(renderer):
+            return renderer
+    return None
+
+
+def export_targets(svg_path, formats, dpis):
+    """
+    List the (format, dpi, output path) exports of a page.
+
+    PNGs are written at every dpi, as <page>_<dpi>dpi.png. PDFs keep the vector graphics and
+    are written once, as <page>.pdf, at the highest dpi for embedded images.
+    """
+    svg_path = Path(svg_path)
+    targets = []
+    for image_format in formats:
+        if image_format == "pdf":
+            targets.append(("pdf", max(dpis), svg_path.with_suffix(".pdf")))
+            continue
+        for dpi in dpis:
+            targets.append(
+                (
+                    image_format,
+                    dpi,
+                    svg_path.with_name(f"{svg_path.stem}_{dpi}dpi.{image_format}"),
+                )
+            )
+    return targets
+
+
+def _export_page(renderer, svg_path, image_format, dpi, output_path):
+    # Convert one page with a local renderer, in an export worker process.
+    # Returns an error message, or None on success.
+    import subprocess
+
+    output_path = Path(output_path)
+    temporary = output_path.with_name(
+        f"{output_path.stem}.{os.getpid()}.tmp.{image_format}"
+    )
+    try:
+        if renderer in COMMAND_RENDERERS:
+            subprocess.run(
+                RENDERERS[renderer](svg_path, temporary, image_format, dpi),
+                check=True,
+                capture_output=True,
+                timeout=EXPORT_TIMEOUT,
+            )
+        else:
+            RENDERERS[renderer](svg_path, temporary, image_format, dpi)
+        os.replace(temporary, output_path)
+    except subprocess.CalledProcessError as error:
+        return error.stderr.decode("utf8", "replace").strip() or str(error)
+    except (subprocess.SubprocessError, OSError, ValueError) as error:
+        return str(error)
+    finally:
+        if temporary.exists():
+            temporary.unlink()
+    return None
+
+
+def export_pages(svg_paths, formats, dpis, renderer, cache_dir, jobs=1):
+    """
+    Convert SVG pages to PDF or PNG files next to them, with a local renderer.
+
+    Conversions run in a pool of jobs worker processes. Results are cached in
+    <cache_dir>/exports by (SVG hash, renderer, format, dpi), so unchanged pages are copied
+    instead of converted again.
+
+    :param formats: Export formats, see EXPORT_FORMATS and export_targets.
+    :param dpis: Resolutions, e.g. [72, 300] for previews and print files.
+    :param renderer: Name of the renderer, see RENDERERS.
+    :return: Number of failed conversions.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    export_dir = Path(cache_dir) / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    pending = {}
+    copies = []
+    for svg_path in svg_paths:
+        digest = hashlib.sha256(Path(svg_path).read_bytes()).hexdigest()
+        for image_format, dpi, output_path in export_targets(svg_path, formats, dpis):
+            key = hashlib.sha256(
+                json.dumps([digest, renderer, image_format, dpi]).encode("utf8")
+            ).hexdigest()
+            cache_path = export_dir / f"{key}.{image_format}"
+            if not cache_path.exists():
+                pending[cache_path] = (
+                    renderer,
+                    str(svg_path),
+                    image_format,
+                    dpi,
+                    cache_path,
+                )
+            copies.append((cache_path, output_path))
+
+    start = time.perf_counter()
+    tasks = list(pending.values())
+    jobs = min(jobs if jobs > 0 else os.cpu_count(), len(tasks))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            errors = list(executor.map(_export_page, *zip(*tasks)))
+    else:
+        errors = [_export_page(*task) for task in tasks]
+    failed = 0
+    for task, error in zip(tasks, errors):
+        if error is not None:
+            logging.error(f"Export of {task[1]} to {task[2]} failed: {error}")
+            failed += 1
+    for cache_path, output_path in copies:
+        if cache_path.exists():
+            shutil.copyfile(cache_path, output_path)
+    logging.info(
+        f"Exported {len(pending) - failed} files with {renderer} in {time.perf_counter() - start:.3f} s, reused: {len(copies) - len(pending)}"
+    )
+    return failed
+
+
+# Command lines of local tools merging PDF files, by preference.
+PDF_MERGERS = {
+    "pdfunite": lambda pdf_paths, output_path: ["pdfunite", *pdf_paths, output_path],
+    "qpdf": lambda pdf_paths, output_path: [
+        "qpdf",
+        "--empty",
+        "--pages",
+        *pdf_paths,
+        "--",
+        output_path,
+    ],
+}
+
+
+def merge_pdf(svg_paths, output_path, dpi):
+    """
+    Write the pages of several SVG documents as a single multi-page PDF.
+
+    Uses rsvg-convert, which accepts several documents, or merges their exported PDFs with a
+    tool of PDF_MERGERS.
+
+    :return: False if no local tool can write it.
+    """
+    import subprocess
+
+    output_path = Path(output_path)
+    if shutil.which("rsvg-convert"):
+        command = _rsvg_convert_command(svg_paths[0], output_path, "pdf", dpi)
+        command += [str(svg_path) for svg_path in svg_paths[1:]]
+    else:
+        pdf_paths = [str(Path(svg_path).with_suffix(".pdf")) for svg_path in svg_paths]
+        mergers = [name for name in PDF_MERGERS if shutil.which(name)]
+        if not mergers:
+            return False
+        command = PDF_MERGERS[mergers[0]](pdf_paths, str(output_path))
+    subprocess.run(command, check=True, capture_output=True, timeout=EXPORT_TIMEOUT)
+    return True
+
+
+def export_calendars(args, tasks, sink):
+    """
+    Export the pages of a run with --export, and merge them with --merged-pdf.
+
+    :param tasks: Render tasks of the run, see plan_tasks.
+    :param sink: Output sink the pages were written to. Only files can be exported.
+    :return: Number of failed exports.
+    """
+    import subprocess
+
+    if not isinstance(sink, DirectorySink):
+        logging.warning(f"Pages in the {sink.name} sink cannot be exported, use dir")
+        return 0
+    renderer = args.renderer or default_renderer()
+    if renderer is None or not renderer_available(renderer):
+        logging.warning(
+            f"No local SVG renderer found ({', '.join(RENDERERS)}), skipping the export"
+        )
+        return 0
+    tasks = [
+        (calendar_key, month_indexes, sink.path(output_name), backend)
+        for calendar_key, month_indexes, output_name, backend in tasks
+    ]
+    svg_paths = [output_path for _, _, output_path, _ in tasks]
+    failed = export_pages(
+        svg_paths, args.export, args.export_dpi, renderer, args.cache_dir, args.jobs
+    )
+    if not args.merged_pdf:
+        return failed
+    pages = {}
+    for calendar_key, month_indexes, output_path, _ in tasks:
+        if len(month_indexes) == 1:
+            pages.setdefault(calendar_key, []).append(output_path)
+    for (year, standard), svg_paths in pages.items():
+        output_path = svg_paths[0].parent / f"calendar_{year}.pdf"
+        try:
+            if not merge_pdf(svg_paths, output_path, max(args.export_dpi)):
+                logging.warning(
+                    f"No local tool merges PDF files ({', '.join(['rsvg-convert', *PDF_MERGERS])}), skipping {output_path}"
+                )
+                break
+        except (subprocess.SubprocessError, OSError) as error:
+            logging.error(f"Merging {output_path} failed: {error}")
+            failed += 1
+            continue
+        logging.info(
+            f"Merged {len(svg_paths)} pages of {standard} {year}: {output_path}"
+        )
+    return failed
+
+
+# Arguments of the last configure_logging call, applied again by worker processes that do
+# not inherit the parent's log handlers (spawn and forkserver start methods).
+_log_config = None
+
+
+def configure_logging(log_file, log_console, level=logging.INFO):
+    """
+    Send log messages to a file and/or a console stream.
+
+    :param log_file: Path of the log file, or None.
+    :param log_console: Name of the console stream, "stdout" or "stderr", or None.
+    """
+    global _log_config
+    _log_config = (log_file, log_console, level)
+    handlers = []
+    if log_file is not None:
+        handlers.append(logging.FileHandler(log_file))
+    if log_console is not None:
+        handlers.append(logging.StreamHandler(getattr(sys, log_console)))
+    logging.basicConfig(
+        level=level,
+        format="[%(levelname)s] %(message)s",
+        handlers=handlers or [logging.NullHandler()],
+    )
+    logging.getLogger("fontTools").setLevel(logging.WARNING)
+
+
+# Calendar contexts, shipped once to each worker process by _init_worker.
+_worker_calendars = {}
+
+
+def _init_worker(calendars, log_config=None, profile=False, memory=False):
+    global _worker_calendars
+    _worker_calendars = calendars
+    if profile:
+        profiler.enable(memory)
+    if log_config is not None and not logging.getLogger().handlers:
+        configure_logging(*log_config)
+
+
+def _render_page_task(calendar_key, month_indexes, output_name, backend):
+    stats_before = cache_stats()
+    profiler.begin_page(str(output_name))
+    start = time.perf_counter()
+    buffer = io.StringIO()
+    element_count = write_document(
+        _worker_calendars[calendar_key], month_indexes, buffer, backend
+    )
+    data = buffer.getvalue().encode("utf-8")
+    elapsed = time.perf_counter() - start
+    stats_delta = {
+        name: (hits - stats_before[name][0], misses - stats_before[name][1])
+        for name, (hits, misses) in cache_stats().items()
+    }
+    trace = None
+    if profiler.enabled:
+        profiler.end_page(element_count, len(data), elapsed)
+        trace = profiler.drain()
+        # Measuring the full size renders the page again, so only when profiling.
+        if _worker_calendars[calendar_key]["compact_precision"] is not None:
+            full_size = document_size(
+                dict(_worker_calendars[calendar_key], compact_precision=None),
+                month_indexes,
+            )
+            logging.info(
+                f"Compact {output_name}: {full_size} -> {len(data)} bytes ({len(data) / full_size - 1:+.1%})"
+            )
+    return calendar_key, month_indexes, output_name, elapsed, stats_delta, trace, data
+
+
+def _render_planner_task(calendar_key, mode, prefix, backend, start, stop):
+    return list(
+        render_planner(
+            _worker_calendars[calendar_key], mode, prefix, backend, start, stop
+        )
+    )
+
+
+def parse_arguments(argv=None):
+    # Standards from the config file are registered first, so --standard accepts them.
+    config_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    config_parser.add_argument("--standards-config", type=Path)
+    config_path = config_parser.parse_known_args(argv)[0].standards_config
+    if config_path is not None or DEFAULT_STANDARDS_CONFIG.exists():
+        try:
+            load_standards_config(config_path or DEFAULT_STANDARDS_CONFIG)
+        except (OSError, ValueError) as error:
+            config_parser.error(f"Cannot load standards: {error}")
+
+    parser = argparse.ArgumentParser(description="Generate SVG calendar pages.")
+    parser.add_argument(
+        "--year",
+        type=year_argument,
+        nargs="+",
+        default=[default_year],
+        help=f"Year(s) to render. Default: {default_year}.",
+    )
+    parser.add_argument(
+        "--standard",
+        nargs="+",
+        choices=sorted(STANDARDS) + ["all"],
+        default=[calendar_standard],
+        help=f"Page standard(s) to render in one run, or all. Year data, texts and the font are shared, only the layout is computed per standard. Default: {calendar_standard}.",
+    )
+    parser.add_argument(
+        "--standards-config",
+        type=Path,
+        default=DEFAULT_STANDARDS_CONFIG,
+        help=f"JSON file registering more standards, see load_standards_config. Default: {DEFAULT_STANDARDS_CONFIG}, if it exists.",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=page_size_argument,
+        nargs="+",
+        metavar="WxH",
+        help="Render custom page sizes in mm instead, e.g. 420x297, with the parameters and stylesheet of the first --standard.",
+    )
+    parser.add_argument(
+        "--months",
+        type=int,
+        nargs="+",
+        choices=range(1, 13),
+        metavar="MONTH",
+        default=list(range(1, 13)),
+        help="Months to render, from 1 to 12. Default: all.",
+    )
+    parser.add_argument(
+        "--region",
+        default=DEFAULT_HOLIDAY_REGION,
+        help=f"Holiday region, loaded from {HOLIDAYS_DIR}/<region>.json or .ics. Default: {DEFAULT_HOLIDAY_REGION}.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes. 0 uses one per CPU. Default: 1.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("."),
+        help="Directory for the generated pages. Default: current directory.",
+    )
+    parser.add_argument(
+        "--sink",
+        type=sink_argument,
+        default=(DirectorySink.name, None),
+        metavar="SINK",
+        help="Where pages are written: dir (files in --output-dir), zip[:PATH], tar[:PATH] or tar.gz[:PATH] (an archive streamed as pages complete, PATH - for stdout, default <output-dir>/pages.<kind>), stdout, or memory (discarded, to time rendering). Default: dir.",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=Path,
+        default=DEFAULT_LOG_PATH,
+        metavar="PATH",
+        help=f"File the log is written to, none to disable. Default: {DEFAULT_LOG_PATH}.",
+    )
+    parser.add_argument(
+        "--log-console",
+        choices=["stdout", "stderr", "none"],
+        default="stdout",
+        help="Stream the log is printed to. stderr when pages are written to stdout. Default: stdout.",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Write the months of each calendar as stacked pages of a single test_year.svg.",
+    )
+    parser.add_argument(
+        "--export",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=[],
+        help=f"Also convert the pages to PDF and/or PNG files with a local renderer ({', '.join(RENDERERS)}). Conversions are cached by SVG hash.",
+    )
+    parser.add_argument(
+        "--export-dpi",
+        type=int,
+        nargs="+",
+        default=[300],
+        metavar="DPI",
+        help="Resolutions to export PNGs at, e.g. 72 300 for previews and print files. PDFs use the highest. Default: 300.",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=list(RENDERERS),
+        help="Renderer for --export. Default: the first one installed.",
+    )
+    parser.add_argument(
+        "--merged-pdf",
+        action="store_true",
+        help="Also write the month pages of each calendar as a multi-page calendar_<year>.pdf. Implies --export pdf.",
+    )
+    parser.add_argument(
+        "--planner",
+        choices=sorted(PLANNER_MODES),
+        help="Render a weekly (one page per week) or daily (one page per day) planner instead of month pages, as planner_<mode>_<page>.svg. Pages are written as they are produced.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=SvgwriteBackend.name,
+        help="Output backend. svgwrite builds a validated element tree, stream writes elements as they are produced. Default: svgwrite.",
+    )
+    parser.add_argument(
+        "--compact",
+        type=int,
+        nargs="?",
+        const=2,
+        metavar="DECIMALS",
+        help="Write smaller pages: coordinates rounded to DECIMALS (default 2), minified CSS and short class names. With --profile, logs the size reduction of each page.",
+    )
+    parser.add_argument(
+        "--photos",
+        type=Path,
+        default=PHOTOS_DIR,
+        metavar="DIR",
+        help=f"Directory with a photo per month, named by month number, e.g. 01.jpg. Photos are fitted above the month texts. Default: {PHOTOS_DIR}, if it exists.",
+    )
+    parser.add_argument(
+        "--photo-dpi",
+        type=int,
+        default=DEFAULT_PHOTO_DPI,
+        help=f"Resolution photos are downscaled to. Default: {DEFAULT_PHOTO_DPI}.",
+    )
+    parser.add_argument(
+        "--photo-format",
+        choices=sorted(PHOTO_FORMATS),
+        default="jpeg",
+        help="Format photos are re-encoded to. Default: jpeg.",
+    )
+    parser.add_argument(
+        "--photo-min-size",
+        type=float,
+        default=DEFAULT_PHOTO_MIN_SIZE_MM,
+        metavar="MM",
+        help=f"Smallest photo frame side, in mm. Photos that would be printed smaller are left out with a warning, 0 keeps them all. Default: {DEFAULT_PHOTO_MIN_SIZE_MM}.",
+    )
+    parser.add_argument(
+        "--link-photos",
+        action="store_true",
+        help="Link to the resized photos in the cache directory instead of embedding them in the pages.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached build artifacts. Default: {DEFAULT_CACHE_DIR}.",
+    )
+    parser.add_argument(
+        "--page-cache-size",
+        type=float,
+        default=DEFAULT_PAGE_CACHE_SIZE_MB,
+        metavar="MB",
+        help=f"Size of the store of rendered pages in the cache directory. The least recently used pages are deleted above it, 0 disables the store. Default: {DEFAULT_PAGE_CACHE_SIZE_MB}.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Render every page, even if an up-to-date copy is cached.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-render the pages affected by changes to the input files. Renders in a single process.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="PATH",
+        help="Record time and calls per render stage, and elements and bytes per page, to this trace file.",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=Profiler.formats,
+        help="Format of the --profile trace. chrome writes trace events for chrome://tracing or Perfetto. Default: csv for .csv paths, json otherwise.",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Trace allocations with tracemalloc and report peak and retained memory per page and stage. Slows rendering down.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        metavar="MB",
+        help="Fail the run if the traced peak memory of any process exceeds this many MB. Implies --memory-report.",
+    )
+    parser.add_argument(
+        "--leak-tolerance",
+        type=float,
+        default=256,
+        metavar="KB",
+        help="Flag pages still holding more than this many KB once saved, with --memory-report. New fragment cache entries count as retained. Default: 256.",
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        metavar="MANIFEST",
+        help="Render one calendar per row of a CSV or JSONL manifest, each in <output-dir>/<id>. Rows may set id, year, standard, region, texts_file, texts (JSONL) or summary_<month> and description_<month> columns. Interrupted batches resume where they stopped unless --force is given.",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="With --batch, write each calendar as <output-dir>/<id>.zip instead of a directory.",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="Serve pages over HTTP on this port instead of writing files. 0 picks a free port.",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to serve on with --serve. Default: 127.0.0.1.",
+    )
+    parser.add_argument(
+        "--serve-cache-size",
+        type=int,
+        default=256,
+        help="Number of rendered documents kept in memory with --serve. Default: 256.",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between checks for changes in watch mode. Default: 0.5.",
+    )
+    args = parser.parse_args(argv)
+    if args.watch and args.sink[0] != DirectorySink.name:
+        parser.error("--watch only writes to the dir sink")
+    if args.export or args.merged_pdf:
+        modes = {
+            "--planner": args.planner is not None,
+            "--batch": args.batch is not None,
+            "--serve": args.serve is not None,
+            "--watch": args.watch,
+        }
+        for option, enabled in modes.items():
+            if enabled:
+                parser.error(f"--export and --merged-pdf cannot be used with {option}")
+    if args.merged_pdf and args.combined:
+        parser.error(
+            "--merged-pdf merges month pages, it cannot be used with --combined"
+        )
+    return args
+
+
+def prepare_calendars(args, photo_texts, font_data, stylesheets=None):
+    """
+    Build the calendar context of every (year, standard) pair requested.
+
+    :param stylesheets: Cache of (StyleIndex, layout) pairs to reuse, by standard.
+    """
+    stylesheets = {} if stylesheets is None else stylesheets
+    calendars = {}
+    for standard in args.standard:
+        for year in args.year:
+            calendars[(year, standard)] = build_calendar_context(
+                year,
+                standard,
+                stylesheets,
+                photo_texts,
+                font_data,
+                args.cache_dir,
+                args.region,
+                args.compact,
+            )
+    if args.photos.is_dir():
+        prepare_photos(
+            calendars,
+            month_photo_paths(args.photos),
+            args.photo_dpi,
+            args.photo_format,
+            args.link_photos,
+            args.cache_dir,
+            args.jobs,
+            args.photo_min_size,
+        )
+    elif args.photos != PHOTOS_DIR:
+        logging.warning(f"Photo directory {args.photos} not found")
+    return calendars
+
+
+def calendar_prefix(calendars, calendar_key):
+    """
+    Get the directory of the pages of a calendar in the output sink.
+    """
+    # Pages go straight in the output directory unless several calendars are rendered.
+    year, standard = calendar_key
+    if len(calendars) > 1:
+        return Path(f"{standard}_{year}")
+    return Path()
+
+
+def plan_tasks(args, calendars):
+    """
+    List the (calendar key, month indexes, output name, backend) render tasks of a run.
+
+    Output names are relative to the output sink.
+    """
+    tasks = []
+    for calendar_key in calendars:
+        prefix = calendar_prefix(calendars, calendar_key)
+        month_indexes = [month - 1 for month in sorted(set(args.months))]
+        if args.combined:
+            tasks.append(
+                (calendar_key, month_indexes, prefix / "test_year.svg", args.backend)
+            )
+            continue
+        for month_index in month_indexes:
+            tasks.append(
+                (
+                    calendar_key,
+                    [month_index],
+                    prefix / f"test_month_{month_index}.svg",
+                    args.backend,
+                )
+            )
+    return tasks
+
+
+def run_tasks(tasks, calendars, jobs):
+    """
+    Render tasks, in this process or in a pool of jobs worker processes.
+
+    :return: Generator of one (calendar key, month indexes, output name, seconds, cache stats,
+        profile trace, document bytes) tuple per task, as tasks complete. The trace is None
+        unless the profiler is enabled.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    jobs = jobs if jobs > 0 else os.cpu_count()
+    jobs = min(jobs, len(tasks))
+    if jobs <= 1:
+        _init_worker(calendars, _log_config, profiler.enabled, profiler.memory)
+        for task in tasks:
+            yield _render_page_task(*task)
+        return
+    logging.info(f"Rendering {len(tasks)} pages with {jobs} processes")
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(calendars, _log_config, profiler.enabled, profiler.memory),
+    ) as executor:
+        futures = [executor.submit(_render_page_task, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+PLANNER_CHUNK_PAGES = 16
+
+
+def run_planner(args, calendars, writer):
+    """
+    Render the planner pages of every calendar to a SinkWriter and log the throughput.
+
+    With several jobs, worker processes render chunks of PLANNER_CHUNK_PAGES consecutive pages,
+    with at most two chunks in flight per worker, and pages are written in order.
+
+    :return: Number of pages written.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    start = time.perf_counter()
+    pages = 0
+
+    def collect(output_name, data, page_time):
+        nonlocal pages
+        writer.write(output_name, data)
+        pages += 1
+        logging.debug(f"Page {output_name}: {page_time:.3f} s")
+        if pages % 100 == 0:
+            logging.info(
+                f"{pages} pages, {pages / (time.perf_counter() - start):.1f} pages/s"
+            )
+
+    if jobs <= 1:
+        _init_worker(calendars, _log_config)
+        for calendar_key, calendar in calendars.items():
+            for page in render_planner(
+                calendar,
+                args.planner,
+                calendar_prefix(calendars, calendar_key),
+                args.backend,
+            ):
+                collect(*page)
+    else:
+        logging.info(f"Rendering planner pages with {jobs} processes")
+        chunks = (
+            (
+                calendar_key,
+                args.planner,
+                calendar_prefix(calendars, calendar_key),
+                args.backend,
+                first,
+                first + PLANNER_CHUNK_PAGES,
+            )
+            for calendar_key, calendar in calendars.items()
+            for first in range(
+                0,
+                sum(1 for _ in PLANNER_MODES[args.planner](calendar["years"][1].year)),
+                PLANNER_CHUNK_PAGES,
+            )
+        )
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(calendars, _log_config),
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_render_planner_task, *chunk))
+                if len(pending) >= 2 * jobs:
+                    for page in pending.popleft().result():
+                        collect(*page)
+            while pending:
+                for page in pending.popleft().result():
+                    collect(*page)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Rendered {pages} planner pages in {elapsed:.3f} s ({pages / elapsed:.1f} pages/s)"
+    )
+    return pages
+
+
+def render_calendars(tasks, calendars, jobs, writer, page_cache=None, force=False):
+    """
+    Render the tasks whose outputs are out of date to a SinkWriter and log the run summary.
+
+    :param page_cache: PageCache used to skip or reuse unchanged pages. None renders everything.
+    :param force: Render every task even if its fingerprint is cached.
+    :return: Number of (rebuilt, reused) outputs.
+    """
+    pending = []
+    fingerprints = {}
+    reused = 0
+    for task in tasks:
+        calendar_key, month_indexes, output_name, _ = task
+        if page_cache is not None:
+            fingerprint = page_fingerprint(calendars[calendar_key], month_indexes)
+            fingerprints[output_name] = fingerprint
+            output_path = writer.sink.path(output_name)
+            if not force:
+                if output_path is not None and page_cache.is_current(
+                    output_path, fingerprint
+                ):
+                    reused += 1
+                    continue
+                data = page_cache.load(fingerprint)
+                if data is not None:
+                    writer.write(output_name, data)
+                    page_cache.record(output_path, fingerprint)
+                    reused += 1
+                    continue
+        pending.append(task)
+
+    start = time.perf_counter()
+    rebuilt = 0
+    run_stats = {}
+    for (
+        (year, standard),
+        month_indexes,
+        output_name,
+        page_time,
+        stats,
+        trace,
+        data,
+    ) in (run_tasks(pending, calendars, jobs) if pending else []):
+        writer.write(output_name, data)
+        rebuilt += 1
+        months_label = ",".join(str(month_index) for month_index in month_indexes)
+        logging.info(
+            f"Page {standard} {year} month {months_label}: {page_time:.3f} s ({output_name})"
+        )
+        for name, (hits, misses) in stats.items():
+            total_hits, total_misses = run_stats.get(name, (0, 0))
+            run_stats[name] = (total_hits + hits, total_misses + misses)
+        if trace is not None:
+            profiler.merge(trace)
+        if page_cache is not None:
+            # Stored from the writer thread, so collecting pages never waits on the copy.
+            writer.after(
+                functools.partial(
+                    page_cache.store,
+                    writer.sink.path(output_name),
+                    fingerprints[output_name],
+                    data,
+                ),
+                flush=False,
+            )
+    elapsed = time.perf_counter() - start
+    if page_cache is not None:
+        # The manifest only lists outputs once they are written.
+        writer.after(page_cache.save)
+
+    logging.info(f"Rendered {rebuilt} files in {elapsed:.3f} s")
+    logging.info(f"Pages rebuilt: {rebuilt}, reused: {reused}")
+    for name, (hits, misses) in run_stats.items():
+        logging.info(f"Fragment cache '{name}': {hits} hits, {misses} misses")
+    return rebuilt, reused
+
+
+def watched_paths(args):
+    """
+    Input files of a run: photo texts, photos, stylesheets, fonts and holiday rules.
+    """
+    paths = [PHOTO_TEXT_PATH, args.standards_config]
+    paths += [Path(stylesheet_path(standard)) for standard in args.standard]
+    for directory in (FONT_PATH.parent, HOLIDAYS_DIR, args.photos):
+        if directory.is_dir():
+            paths += sorted(directory.iterdir())
+    return paths
+
+
+def snapshot_paths(paths):
+    """
+    Get the (mtime, size) of each path, None for missing files.
+    """
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            snapshot[path] = None
+    return snapshot
+
+
+def rebuild(args, sink, page_cache):
+    """
+    Render the pages of a watch run from the current input files.
+
+    :return: (rebuilt, reused) page counts.
+    """
+    photo_texts = load_photo_texts(PHOTO_TEXT_PATH)
+    font_data = load_font_data_uri(
+        FONT_PATH, collect_font_characters(photo_texts), args.cache_dir
+    )
+    calendars = prepare_calendars(args, photo_texts, font_data)
+    tasks = plan_tasks(args, calendars)
+    writer = SinkWriter(sink)
+    try:
+        return render_calendars(tasks, calendars, 1, writer, page_cache)
+    finally:
+        writer.close()
+
+
+def watch(args, sink, page_cache, interval=0.5):
+    """
+    Poll the input files and re-render the pages affected by each change, until interrupted.
+
+    Rendering runs in this process so parsed stylesheets, year data and fragment caches stay
+    warm between rebuilds. Pages whose fingerprint did not change are skipped by page_cache.
+    A failed rebuild (e.g. a half-typed edit) is logged and retried on the next change, with
+    the changes counted from the last successful rebuild.
+    """
+    previous = None
+    failed = None
+    logging.info(f"Watching for changes every {interval} s, press Ctrl+C to stop")
+    try:
+        while True:
+            current = snapshot_paths(watched_paths(args))
+            if current != previous and current != failed:
+                if previous is not None:
+                    changed = sorted(
+                        str(path)
+                        for path in current.keys() | previous.keys()
+                        if current.get(path) != previous.get(path)
+                    )
+                    logging.info(f"Changed: {', '.join(changed)}")
+                    if any(Path(path).parent == HOLIDAYS_DIR for path in changed):
+                        get_holiday_calendar.cache_clear()
+                        get_year_data.cache_clear()
+                        get_month_cells.cache_clear()
+                    if str(args.standards_config) in changed and (
+                        args.standards_config.exists()
+                    ):
+                        load_standards_config(args.standards_config)
+                start = time.perf_counter()
+                try:
+                    rebuild(args, sink, page_cache)
+                except Exception as exception:
+                    logging.error(
+                        f"Rebuild failed, waiting for the next change: {exception!r}"
+                    )
+                    failed = current
+                else:
+                    logging.info(f"Rebuilt in {time.perf_counter() - start:.3f} s")
+                    if profiler.enabled:
+                        report_profile(args)
+                    previous = current
+                    failed = None
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+
+
+class CalendarRequestHandler:
+    """
+    Serve calendar pages rendered in this process.
+
+    GET /month?year=2026&month=3&standard=A3&region=CL renders one page, GET /year a combined
+    document of every month. POST the same parameters as a JSON object to pass "texts", a list
+    of 12 [summary, description] pairs. GET /stats returns cache statistics.
+
+    Mixed into http.server.BaseHTTPRequestHandler by serve, so http.server is only imported
+    when serving. Requests are handled one at a time by HTTPServer: fragment caches and the
+    profiler are not thread safe, so a threading server would need a lock around rendering.
+    """
+
+    server_version = "calendarGen"
+    backend = SvgwriteBackend.name
+    cache_dir = DEFAULT_CACHE_DIR
+    response_cache = None
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/stats":
+            body = json.dumps(cache_stats()).encode("utf-8")
+            self._respond(200, "application/json", body)
+            return
+        query = dict(urllib.parse.parse_qsl(url.query))
+        self._render(url.path, query)
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            parameters = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as error:
+            self.send_error(400, f"Invalid JSON body: {error}")
+            return
+        if not isinstance(parameters, dict):
+            self.send_error(400, "The JSON body must be an object")
+            return
+        self._render(url.path, parameters)
+
+    def _render(self, path, parameters):
+        if path not in ("/month", "/year"):
+            self.send_error(404, "Expected /month, /year or /stats")
+            return
+        try:
+            year = int(parameters.get("year", default_year))
+            month = int(parameters.get("month", 1))
+            standard = parameters.get("standard", calendar_standard)
+            region = parameters.get("region", DEFAULT_HOLIDAY_REGION)
+            texts = parameters.get("texts")
+            texts_key = None
+            if texts is not None:
+                texts_key = tuple((str(pair[0]), str(pair[1])) for pair in texts)
+            key = (
+                path,
+                year,
+                month if path == "/month" else None,
+                standard,
+                region,
+                texts_key,
+            )
+
+            def build():
+                calendar = get_calendar(
+                    year, standard, texts_key, region, self.cache_dir
+                )
+                month_indexes = [month - 1] if path == "/month" else list(range(12))
+                if not all(0 <= index < 12 for index in month_indexes):
+                    raise ValueError(f"Month must be from 1 to 12, got {month}")
+                return render_document(calendar, month_indexes, self.backend)
+
+            body = self.response_cache.get(key, build)
+        except (
+            ValueError,
+            TypeError,
+            IndexError,
+            KeyError,
+            FileNotFoundError,
+        ) as error:
+            self.send_error(400, str(error))
+            return
+        self._respond(200, "image/svg+xml", body)
+
+    def _respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} {format % args}")
+
+
+def read_manifest(manifest_path):
+    """
+    Read a batch manifest one row at a time, as dictionaries.
+
+    .jsonl manifests have one JSON object per line, anything else is read as CSV with a header.
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, "r", encoding="utf8", newline="") as file:
+        if manifest_path.suffix.lower() == ".jsonl":
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def manifest_photo_texts(row):
+    """
+    Get the photo texts of a manifest row.
+
+    Texts come from a "texts" list of [summary, description] pairs, from summary_<month> and
+    description_<month> columns, or from a "texts_file" in the TextoFotos.txt format.
+    Months left out use DEFAULT_PHOTO_TEXT. Rows without texts use PHOTO_TEXT_PATH.
+    """
+    if row.get("texts"):
+        texts = [list(pair) for pair in row["texts"]][:12]
+        return texts + [DEFAULT_PHOTO_TEXT] * (12 - len(texts))
+    if any(row.get(f"summary_{month}") for month in range(1, 13)):
+        return [
+            (
+                row.get(f"summary_{month}") or DEFAULT_PHOTO_TEXT[0],
+                row.get(f"description_{month}") or DEFAULT_PHOTO_TEXT[1],
+            )
+            for month in range(1, 13)
+        ]
+    return load_photo_texts(row.get("texts_file") or PHOTO_TEXT_PATH)
+
+
+# Batch settings from the command line, set in each process by _init_batch_worker.
+_batch_options = {}
+
+
+def _init_batch_worker(options, log_config, worker_process=False):
+    global _batch_options
+    _batch_options = options
+    STANDARDS.update(options["standards"])
+    _init_worker({}, log_config)
+    if worker_process:
+        # Ctrl+C is handled by the parent, which stops submitting rows.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _render_batch_task(row_number, row):
+    """
+    Render the calendar of one manifest row, as documents named <id>/<page> or <id>.zip.
+
+    :return: (row number, row id, [(output name, document bytes)], cache stats, error message
+        or None).
+    """
+    import zipfile
+
+    options = _batch_options
+    stats_before = cache_stats()
+    row_id = str(row.get("id") or "").strip()
+    try:
+        if not row_id or Path(row_id).name != row_id or row_id.startswith("."):
+            raise ValueError(f"Invalid id {row_id!r}")
+        year = int(row.get("year") or options["year"])
+        standard = row.get("standard") or options["standard"]
+        if standard not in STANDARDS:
+            raise ValueError(f"Unknown standard {standard}")
+        region = row.get("region") or options["region"]
+        photo_texts = manifest_photo_texts(row)
+        font_data = _api_font_data(
+            collect_font_characters(photo_texts), options["cache_dir"]
+        )
+        calendar = build_calendar_context(
+            year,
+            standard,
+            _api_stylesheets,
+            photo_texts,
+            font_data,
+            options["cache_dir"],
+            region,
+            options["compact"],
+        )
+        if options["combined"]:
+            documents = [("test_year.svg", options["month_indexes"])]
+        else:
+            documents = [
+                (f"test_month_{month_index}.svg", [month_index])
+                for month_index in options["month_indexes"]
+            ]
+        outputs = [
+            (
+                f"{row_id}/{name}",
+                render_document(calendar, month_indexes, options["backend"]),
+            )
+            for name, month_indexes in documents
+        ]
+        if options["archive"]:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name, data in outputs:
+                    archive.writestr(name.partition("/")[2], data)
+            outputs = [(f"{row_id}.zip", buffer.getvalue())]
+        error = None
+    except (ValueError, TypeError, KeyError, OSError) as exception:
+        outputs = []
+        error = str(exception)
+    stats_delta = {
+        name: (
+            hits - stats_before.get(name, (0, 0))[0],
+            misses - stats_before.get(name, (0, 0))[1],
+        )
+        for name, (hits, misses) in cache_stats().items()
+    }
+    return row_number, row_id, outputs, stats_delta, error
+
+
+def manifest_identity(manifest_path):
+    """
+    Identify a manifest file by resolved path, size and modification time.
+    """
+    manifest_path = Path(manifest_path)
+    stat = manifest_path.stat()
+    return [str(manifest_path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+class BatchProgress:
+    """
+    Resume point of a batch: the number of manifest rows done, counted from the first row,
+    and the rows among them that failed.
+
+    Rows finishing out of order are held until every row before them is done, so the saved
+    count only covers finished rows, and memory stays bounded by the rows in flight. The saved
+    progress belongs to one manifest, progress of another manifest or of an edited one is
+    ignored.
+    """
+
+    def __init__(self, path, manifest_path, restart=False):
+        self.path = Path(path)
+        self.manifest = manifest_identity(manifest_path)
+        self.completed = 0
+        self.failed = set()
+        if not restart and self.path.exists():
+            with open(self.path, "r", encoding="utf8") as file:
+                saved = json.load(file)
+            if saved.get("manifest") == self.manifest:
+                self.completed = saved["completed_rows"]
+                self.failed = set(saved.get("failed_rows", []))
+            else:
+                logging.info(
+                    f"{self.path} belongs to another manifest, starting from the first row"
+                )
+        self.finished = set()
+
+    def pending(self, row_number):
+        """
+        Whether a row must be rendered: not done yet, or failed in an earlier run.
+        """
+        return row_number >= self.completed or row_number in self.failed
+
+    def finish(self, row_number, failed=False):
+        if failed:
+            self.failed.add(row_number)
+        else:
+            self.failed.discard(row_number)
+        if row_number < self.completed:
+            self._save()
+            return
+        self.finished.add(row_number)
+        if self.completed not in self.finished:
+            return
+        while self.completed in self.finished:
+            self.finished.remove(self.completed)
+            self.completed += 1
+        self._save()
+
+    def _save(self):
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf8") as file:
+            json.dump(
+                {
+                    "manifest": self.manifest,
+                    "completed_rows": self.completed,
+                    "failed_rows": sorted(self.failed),
+                },
+                file,
+            )
+        os.replace(temporary, self.path)
+
+
+def run_batch(args, sink):
+    """
+    Render one calendar per row of the --batch manifest, streaming rows as they are read.
+
+    Rows are rendered in this process or in a pool of --jobs workers, with at most a few rows
+    in flight per worker, and each process keeps its fonts, stylesheets, year data and
+    fragment caches warm across rows. Documents are written to the output sink by a
+    SinkWriter thread. With the dir sink, progress is saved once the documents of a row are
+    written, so an interrupted batch of the same manifest resumes after the last row done and
+    retries the rows that failed, unless --force is given. Other sinks always start from the
+    first row.
+
+    :return: Number of rows that failed.
+    """
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ProcessPoolExecutor,
+        as_completed,
+        wait,
+    )
+
+    progress = None
+    if sink.resumable:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        progress = BatchProgress(
+            args.output_dir / ".batch_progress.json", args.batch, args.force
+        )
+        if progress.completed:
+            logging.info(
+                f"Resuming {args.batch} after row {progress.completed}, retrying {len(progress.failed)} failed rows"
+            )
+    options = {
+        "year": args.year[0],
+        "standard": args.standard[0],
+        "region": args.region,
+        "month_indexes": [month - 1 for month in sorted(set(args.months))],
+        "combined": args.combined,
+        "backend": args.backend,
+        "compact": args.compact,
+        "cache_dir": args.cache_dir,
+        "archive": args.archive,
+        "standards": STANDARDS,
+    }
+    rows = (
+        (row_number, row)
+        for row_number, row in enumerate(read_manifest(args.batch))
+        if progress is None or progress.pending(row_number)
+    )
+
+    done = 0
+    failed = 0
+    run_stats = {}
+    start = time.perf_counter()
+
+    def collect(result):
+        nonlocal done, failed
+        row_number, row_id, outputs, stats, error = result
+        for name, (hits, misses) in stats.items():
+            total_hits, total_misses = run_stats.get(name, (0, 0))
+            run_stats[name] = (total_hits + hits, total_misses + misses)
+        for output_name, data in outputs:
+            writer.write(output_name, data)
+        if error is None:
+            done += 1
+            logging.info(f"Row {row_number + 1} ({row_id}): {len(outputs)} files")
+        else:
+            failed += 1
+            logging.error(f"Row {row_number + 1} ({row_id}) failed: {error}")
+        if progress is not None:
+            writer.after(
+                functools.partial(progress.finish, row_number, error is not None)
+            )
+        if (done + failed) % 100 == 0:
+            elapsed = time.perf_counter() - start
+            logging.info(
+                f"{done + failed} rows in {elapsed:.1f} s ({60 * done / elapsed:.1f} calendars/min)"
+            )
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    executor = None
+    interrupted = False
+    writer = SinkWriter(sink)
+    try:
+        if jobs <= 1:
+            _init_batch_worker(options, _log_config)
+            for row_number, row in rows:
+                collect(_render_batch_task(row_number, row))
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_batch_worker,
+                initargs=(options, _log_config, True),
+            )
+            pending = set()
+            for row_number, row in rows:
+                pending.add(executor.submit(_render_batch_task, row_number, row))
+                if len(pending) >= 2 * jobs:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(future.result())
+            for future in as_completed(pending):
+                collect(future.result())
+    except KeyboardInterrupt:
+        interrupted = True
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+        if interrupted and progress is not None:
+            logging.info(
+                f"Interrupted, {progress.completed} rows done. Run again to resume."
+            )
+
+    elapsed = time.perf_counter() - start
+    rate = 60 * done / elapsed if elapsed > 0 else 0
+    logging.info(
+        f"Batch done: {done} calendars, {failed} failed, in {elapsed:.1f} s ({rate:.1f} calendars/min)"
+    )
+    for name, (hits, misses) in run_stats.items():
+        logging.info(f"Fragment cache '{name}': {hits} hits, {misses} misses")
+    return failed
+
+
+def serve(args):
+    """
+    Serve pages over HTTP until interrupted, see CalendarRequestHandler.
+
+    Stylesheets, fonts, year data and fragment caches stay warm between requests, and rendered
+    documents are kept in an LRU cache keyed by the request parameters.
+    """
+    CalendarRequestHandler.backend = args.backend
+    CalendarRequestHandler.cache_dir = args.cache_dir
+    CalendarRequestHandler.response_cache = FragmentCache(
+        "response", maxsize=args.serve_cache_size
+    )
+    # Warm up imports, stylesheets and fonts before the first request.
+    for standard in args.standard:
+        for year in args.year:
+            get_calendar(year, standard, None, args.region, args.cache_dir)
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    handler = type(
+        "CalendarHTTPRequestHandler",
+        (CalendarRequestHandler, BaseHTTPRequestHandler),
+        {},
+    )
+    server = HTTPServer((args.host, args.serve), handler)
+    logging.info(
+        f"Serving on http://{args.host}:{server.server_port}, press Ctrl+C to stop"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Stopped serving.")
+    finally:
+        server.server_close()
+
+
+def report_profile(args):
+    """
+    Log the profiler summary and memory report, and write the --profile trace.
+
+    :return: False if the traced peak memory exceeds --memory-budget.
+    """
+    for name, (calls, seconds, peak) in sorted(profiler.summary().items()):
+        memory = f", peak {peak / 2**20:.2f} MB" if peak is not None else ""
+        logging.info(f"Stage {name}: {calls} calls, {seconds:.3f} s{memory}")
+    if profiler.pages:
+        elements = sum(page["elements"] for page in profiler.pages)
+        size = sum(page["bytes"] for page in profiler.pages)
+        logging.info(
+            f"{len(profiler.pages)} pages: {elements} elements, {size} bytes written"
+        )
+    within_budget = True
+    if profiler.memory:
+        for page in profiler.pages:
+            logging.info(
+                f"Memory {page['page']}: peak {page['memory_peak'] / 2**20:.2f} MB, retained {page['memory_retained'] / 2**10:.1f} KB"
+            )
+        for page in profiler.leaking_pages(args.leak_tolerance * 2**10):
+            logging.warning(
+                f"Page {page['page']} retained {page['memory_retained'] / 2**10:.1f} KB after saving, above the {args.leak_tolerance:g} KB tolerance"
+            )
+        peak = profiler.memory_peak()
+        logging.info(f"Traced peak memory: {peak / 2**20:.2f} MB")
+        if args.memory_budget is not None and peak > args.memory_budget * 2**20:
+            logging.error(
+                f"Traced peak memory {peak / 2**20:.2f} MB exceeds the {args.memory_budget:g} MB budget"
+            )
+            within_budget = False
+    if args.profile:
+        profiler.write(args.profile, args.profile_format)
+        logging.info(f"Profile written to {args.profile}")
+    return within_budget
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if "all" in args.standard:
+        args.standard = sorted(STANDARDS)
+    if args.page_size:
+        args.standard = [
+            register_page_size(width, height, args.standard[0])
+            for width, height in args.page_size
+        ]
+    log_console = args.log_console
+    if log_console == "stdout" and (
+        args.sink[0] == StdoutSink.name or args.sink[1] == "-"
+    ):
+        log_console = "stderr"
+    configure_logging(
+        None if str(args.log_file) == "none" else args.log_file,
+        None if log_console == "none" else log_console,
+    )
+    memory_report = args.memory_report or args.memory_budget is not None
+    if args.profile is not None or memory_report:
+        profiler.enable(memory_report)
+
+    # Prepare shared data once, before any page is rendered.
+    page_cache = PageCache(args.cache_dir, args.page_cache_size * 1024 * 1024)
+    if args.serve is not None:
+        serve(args)
+        return
+    sink = open_sink(*args.sink, args.output_dir)
+    if args.watch:
+        watch(args, sink, page_cache, args.watch_interval)
+        return
+    if args.batch is not None:
+        try:
+            failed = run_batch(args, sink)
+        except KeyboardInterrupt:
+            sys.exit(130)
+        finally:
+            sink.close()
+        if failed:
+            sys.exit(1)
+        return
+    photo_texts = load_photo_texts(PHOTO_TEXT_PATH)
+    font_data = load_font_data_uri(
+        FONT_PATH, collect_font_characters(photo_texts), args.cache_dir
+    )
+    try:
+        calendars = prepare_calendars(args, photo_texts, font_data)
+    except ValueError as error:
+        logging.error(f"Cannot prepare the calendars: {error}")
+        sys.exit(1)
+    writer = SinkWriter(sink)
+    try:
+        if args.planner is not None:
+            run_planner(args, calendars, writer)
+        else:
+            tasks = plan_tasks(args, calendars)
+            render_calendars(
+                tasks, calendars, args.jobs, writer, page_cache, args.force
+            )
+    finally:
+        writer.close()
+        sink.close()
+    if args.planner is None:
+        if args.merged_pdf and "pdf" not in args.export:
+            args.export.append("pdf")
+        if args.export and export_calendars(args, tasks, sink):
+            sys.exit(1)
+    if profiler.enabled and not report_profile(args):
+        sys.exit(1)
+    logging.info("Done.")
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+
+@pytest.fixture(autouse=True)
+def repo_dir(monkeypatch):
+    # calendarCore reads fonts, stylesheets, texts and holiday rules relative to the working
+    # directory.
+    monkeypatch.chdir(REPO_DIR)
+    return REPO_DIR
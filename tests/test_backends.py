@@ -0,0 +1,57 @@
+import pytest
+
+import calendarCore as cg
+
+
+def make_calendar(standard, compact_precision=None):
+    photo_texts = cg.load_photo_texts(cg.PHOTO_TEXT_PATH)
+    font_data = cg.load_font_data_uri(
+        cg.FONT_PATH, cg.collect_font_characters(photo_texts)
+    )
+    return cg.build_calendar_context(
+        2026,
+        standard,
+        {},
+        photo_texts,
+        font_data,
+        compact_precision=compact_precision,
+    )
+
+
+@pytest.fixture(scope="module", params=sorted(cg.STANDARDS))
+def calendar(request):
+    return make_calendar(request.param)
+
+
+def assert_same_document(calendar, month_indexes):
+    reference = cg.render_document(calendar, month_indexes, cg.SvgwriteBackend.name)
+    assert cg.render_document(calendar, month_indexes, cg.SVGStreamWriter.name) == (
+        reference
+    )
+
+
+def test_month_pages_are_byte_identical(calendar):
+    for month_index in range(12):
+        assert_same_document(calendar, [month_index])
+
+
+def test_combined_document_is_byte_identical(calendar):
+    assert_same_document(calendar, list(range(12)))
+
+
+def test_compact_pages_are_byte_identical():
+    calendar = make_calendar("A3", compact_precision=2)
+    assert_same_document(calendar, [0])
+    assert_same_document(calendar, list(range(12)))
+
+
+@pytest.mark.parametrize("mode", sorted(cg.PLANNER_MODES))
+def test_planner_pages_are_byte_identical(calendar, mode):
+    pages = {
+        backend: [
+            data
+            for _, data, _ in cg.render_planner(calendar, mode, backend=backend, stop=8)
+        ]
+        for backend in (cg.SvgwriteBackend.name, cg.SVGStreamWriter.name)
+    }
+    assert pages[cg.SvgwriteBackend.name] == pages[cg.SVGStreamWriter.name]
@@ -0,0 +1,84 @@
+import json
+
+import calendarCore as cg
+
+
+def run_batch(manifest_path, output_dir, *options):
+    args = cg.parse_arguments(
+        [
+            "--batch",
+            str(manifest_path),
+            "--output-dir",
+            str(output_dir),
+            "--cache-dir",
+            str(output_dir / "cache"),
+            "--months",
+            "1",
+            "--jobs",
+            "1",
+            *options,
+        ]
+    )
+    return cg.run_batch(args, cg.DirectorySink(output_dir))
+
+
+def test_resume_skips_rows_done(tmp_path):
+    manifest_path = tmp_path / "m.csv"
+    manifest_path.write_text("id,year\na,2026\nb,2027\n", encoding="utf8")
+    output_dir = tmp_path / "out"
+    assert run_batch(manifest_path, output_dir) == 0
+    assert (output_dir / "b" / "test_month_0.svg").exists()
+
+    (output_dir / "b" / "test_month_0.svg").unlink()
+    assert run_batch(manifest_path, output_dir) == 0
+    assert not (output_dir / "b" / "test_month_0.svg").exists()
+
+    assert run_batch(manifest_path, output_dir, "--force") == 0
+    assert (output_dir / "b" / "test_month_0.svg").exists()
+
+
+def test_other_manifest_starts_from_first_row(tmp_path):
+    output_dir = tmp_path / "out"
+    csv_path = tmp_path / "m.csv"
+    csv_path.write_text("id,year\na,2026\nb,2026\nc,2026\n", encoding="utf8")
+    assert run_batch(csv_path, output_dir) == 0
+
+    jsonl_path = tmp_path / "m.jsonl"
+    jsonl_path.write_text('{"id": "j1"}\n{"id": "j2"}\n', encoding="utf8")
+    assert run_batch(jsonl_path, output_dir) == 0
+    assert (output_dir / "j1" / "test_month_0.svg").exists()
+    assert (output_dir / "j2" / "test_month_0.svg").exists()
+
+
+def test_edited_manifest_starts_from_first_row(tmp_path):
+    output_dir = tmp_path / "out"
+    manifest_path = tmp_path / "m.csv"
+    manifest_path.write_text("id,year\na,2026\n", encoding="utf8")
+    assert run_batch(manifest_path, output_dir) == 0
+
+    manifest_path.write_text("id,year\nedited,2026\n", encoding="utf8")
+    assert run_batch(manifest_path, output_dir) == 0
+    assert (output_dir / "edited" / "test_month_0.svg").exists()
+
+
+def test_failed_rows_are_retried(tmp_path):
+    manifest_path = tmp_path / "m.csv"
+    manifest_path.write_text("id,year\na,2026\nbad/id,2026\n", encoding="utf8")
+    output_dir = tmp_path / "out"
+    assert run_batch(manifest_path, output_dir) == 1
+    with open(output_dir / ".batch_progress.json", "r", encoding="utf8") as file:
+        saved = json.load(file)
+    assert saved["completed_rows"] == 2
+    assert saved["failed_rows"] == [1]
+
+    # Only the failed row is rendered again.
+    (output_dir / "a" / "test_month_0.svg").unlink()
+    assert run_batch(manifest_path, output_dir) == 1
+    assert not (output_dir / "a" / "test_month_0.svg").exists()
+
+    progress = cg.BatchProgress(output_dir / ".batch_progress.json", manifest_path)
+    assert [row for row in range(3) if progress.pending(row)] == [1, 2]
+    progress.finish(1)
+    assert progress.failed == set()
+    progress = cg.BatchProgress(output_dir / ".batch_progress.json", manifest_path)
+    assert not progress.pending(1)
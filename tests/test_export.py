@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+import calendarCore as cg
+
+# Stand-in for rsvg-convert: writes "<format> <dpi> <input names>" and logs each call.
+RSVG_CONVERT = f"""#!{sys.executable}
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+output = Path(args[args.index("--output") + 1])
+inputs = [Path(arg).name for arg in args[8:]]
+values = [args[args.index("--format") + 1], args[args.index("--dpi-x") + 1], *inputs]
+output.write_text(" ".join(values))
+with open(Path(__file__).with_name("calls"), "a") as file:
+    file.write(output.name + "\\n")
+"""
+
+
+@pytest.fixture
+def rsvg_convert(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "rsvg-convert"
+    script.write_text(RSVG_CONVERT)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return bin_dir / "calls"
+
+
+def export(tmp_path):
+    cg.main(
+        [
+            "--output-dir",
+            str(tmp_path / "out"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--year",
+            "2026",
+            "--months",
+            "1",
+            "2",
+            "--jobs",
+            "1",
+            "--export",
+            "pdf",
+            "png",
+            "--export-dpi",
+            "72",
+            "--merged-pdf",
+            "--log-file",
+            "none",
+        ]
+    )
+
+
+def test_exports_are_converted_once_and_copied(tmp_path, rsvg_convert):
+    export(tmp_path)
+    output_dir = tmp_path / "out"
+    assert (output_dir / "test_month_0.pdf").read_text() == "pdf 72 test_month_0.svg"
+    assert (output_dir / "test_month_1_72dpi.png").read_text() == (
+        "png 72 test_month_1.svg"
+    )
+    assert (output_dir / "calendar_2026.pdf").read_text() == (
+        "pdf 72 test_month_0.svg test_month_1.svg"
+    )
+    assert len(rsvg_convert.read_text().splitlines()) == 5
+
+    # Unchanged pages are copied from the export cache, only the merge runs again.
+    (output_dir / "test_month_0.pdf").unlink()
+    export(tmp_path)
+    assert (output_dir / "test_month_0.pdf").read_text() == "pdf 72 test_month_0.svg"
+    assert rsvg_convert.read_text().splitlines()[5:] == ["calendar_2026.pdf"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--planner", "week", "--export", "pdf"],
+        ["--planner", "day", "--merged-pdf"],
+        ["--combined", "--merged-pdf"],
+    ],
+)
+def test_exports_of_other_documents_are_rejected(options, capsys):
+    with pytest.raises(SystemExit):
+        cg.parse_arguments(options)
+    assert "cannot be used with" in capsys.readouterr().err
@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+
+import calendarCore as cg
+
+# Holidays of 2026 by month index, as hard-coded in YearData before holidays/CL.json.
+CL_2026 = {
+    0: [1],
+    1: [],
+    2: [],
+    3: [3, 4, 5],
+    4: [1, 21],
+    5: [21, 29],
+    6: [16],
+    7: [15],
+    8: [18, 19],
+    9: [12, 31],
+    10: [1],
+    11: [8, 25],
+}
+
+
+def test_cl_rules_reproduce_2026_table():
+    holidays = cg.get_holiday_calendar("CL").holidays(2026)
+    assert {index: sorted(days) for index, days in enumerate(holidays)} == CL_2026
+
+
+def test_year_data_uses_cl_rules():
+    year_data = cg.YearData(2026, "CL")
+    assert [sorted(days) for days in year_data.holidays] == list(CL_2026.values())
+
+
+def test_resolve_holidays_matches_per_year_rules():
+    years = range(2020, 2031)
+    resolved = cg.resolve_holidays(["CL"], years)
+    holiday_calendar = cg.get_holiday_calendar("CL")
+    for year in years:
+        assert resolved[("CL", year)] == holiday_calendar.holidays(year)
+
+
+# Official holidays of other years, including Monday/Friday transfers and the conditional
+# Fiestas Patrias days.
+CL_2018 = {
+    0: [1],
+    1: [],
+    2: [30, 31],
+    3: [1],
+    4: [1, 21],
+    5: [],
+    6: [2, 16],
+    7: [15],
+    8: [17, 18, 19],
+    9: [15],
+    10: [1, 2],
+    11: [8, 25],
+}
+CL_2024 = {
+    0: [1],
+    1: [],
+    2: [29, 30, 31],
+    3: [],
+    4: [1, 21],
+    5: [20, 29],
+    6: [16],
+    7: [15],
+    8: [18, 19, 20],
+    9: [12, 31],
+    10: [1],
+    11: [8, 25],
+}
+
+
+@pytest.mark.parametrize("year, expected", [(2018, CL_2018), (2024, CL_2024)])
+def test_cl_rules_other_years(year, expected):
+    holidays = cg.get_holiday_calendar("CL").holidays(year)
+    assert {index: sorted(days) for index, days in enumerate(holidays)} == expected
+
+
+@pytest.mark.parametrize(
+    "year, days",
+    [
+        (2007, [17, 18, 19]),
+        (2029, [17, 18, 19]),
+        (2019, [18, 19, 20]),
+        (2030, [18, 19, 20]),
+    ],
+)
+def test_cl_conditional_september_holidays(year, days):
+    assert sorted(cg.get_holiday_calendar("CL").holidays(year)[8]) == days
+
+
+def test_only_on_weekdays_condition():
+    rule = {"type": "fixed", "month": 9, "day": 20, "only_on_weekdays": [4]}
+    assert cg.HolidayCalendar.rule_date(rule, 2024) == datetime.date(2024, 9, 20)
+    assert cg.HolidayCalendar.rule_date(rule, 2026) is None
@@ -0,0 +1,44 @@
+import pytest
+
+import calendarCore as cg
+
+
+def layout(standard):
+    style_index = cg.StyleIndex.load(cg.stylesheet_path(standard))
+    return cg.compute_layout(cg.STANDARDS[standard], style_index)
+
+
+@pytest.mark.parametrize("standard", sorted(cg.STANDARDS))
+def test_standard_layouts_have_room_for_the_texts(standard):
+    assert layout(standard).text_max_width > 0
+    assert layout(standard).photo_box[3] > 0
+
+
+def test_small_page_sizes_are_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(cg, "STANDARDS", dict(cg.STANDARDS))
+    standard = cg.register_page_size(100, 50)
+    with pytest.raises(ValueError, match="does not fit 100 x 50 mm"):
+        layout(standard)
+
+    with pytest.raises(SystemExit) as exit_info:
+        cg.main(
+            [
+                "--page-size",
+                "100x50",
+                "--sink",
+                "memory",
+                "--log-file",
+                "none",
+                "--cache-dir",
+                str(tmp_path),
+            ]
+        )
+    assert exit_info.value.code == 1
+
+
+def test_text_functions_reject_non_positive_widths():
+    advances = cg.get_glyph_advances(cg.FONT_PATH, 5)
+    with pytest.raises(ValueError, match="Text width must be positive"):
+        cg.wrap_text("Lunes Martes", -39.96, advances)
+    with pytest.raises(ValueError, match="Text width must be positive"):
+        cg.fit_font_size("Lunes", 0, advances, 5)
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import calendarCore as cg
+
+SPAWN_MAIN = """
+import multiprocessing
+import sys
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    import calendarGen
+
+    calendarGen.main(sys.argv[1:])
+"""
+
+
+def test_spawned_workers_use_the_run_log_settings(tmp_path):
+    # Profiled compact pages make the workers log, see _render_page_task.
+    log_path = tmp_path / "run.log"
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            SPAWN_MAIN,
+            "--sink",
+            "stdout",
+            "--log-console",
+            "none",
+            "--log-file",
+            str(log_path),
+            "--jobs",
+            "2",
+            "--months",
+            "1",
+            "2",
+            "--compact",
+            "2",
+            "--profile",
+            str(tmp_path / "profile.json"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+        ],
+        cwd=Path(cg.__file__).parent,
+        capture_output=True,
+        check=True,
+    )
+    assert b"[INFO]" not in result.stdout
+    assert result.stdout.count(b"<?xml") == 2
+    log = log_path.read_text(encoding="utf8")
+    assert "Compact test_month_0.svg" in log
+    assert "Compact test_month_1.svg" in log
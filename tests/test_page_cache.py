@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import calendarCore as cg
+
+
+def test_text_edit_rebuilds_one_page(tmp_path, monkeypatch):
+    photo_text_path = tmp_path / "TextoFotos.txt"
+    shutil.copyfile(cg.PHOTO_TEXT_PATH, photo_text_path)
+    monkeypatch.setattr(cg, "PHOTO_TEXT_PATH", photo_text_path)
+    output_dir = tmp_path / "out"
+    args = cg.parse_arguments(
+        ["--output-dir", str(output_dir), "--cache-dir", str(tmp_path / "cache")]
+    )
+    sink = cg.DirectorySink(output_dir)
+    page_cache = cg.PageCache(args.cache_dir)
+    assert cg.rebuild(args, sink, page_cache) == (12, 0)
+    assert cg.rebuild(args, sink, page_cache) == (0, 12)
+
+    # A new glyph in the March description only changes the March page.
+    pages = {path.name: path.read_bytes() for path in output_dir.glob("*.svg")}
+    lines = photo_text_path.read_text(encoding="utf8").splitlines(keepends=True)
+    lines[5] = lines[5].rstrip("\n") + " ¿ é Ü\n"
+    photo_text_path.write_text("".join(lines), encoding="utf8")
+    assert cg.rebuild(args, sink, page_cache) == (1, 11)
+    changed = [
+        path.name
+        for path in sorted(output_dir.glob("*.svg"))
+        if path.read_bytes() != pages[path.name]
+    ]
+    assert changed == ["test_month_2.svg"]
+
+
+def test_stored_pages_are_reused(tmp_path):
+    args = cg.parse_arguments(
+        [
+            "--output-dir",
+            str(tmp_path / "out"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--months",
+            "1",
+        ]
+    )
+    page_cache = cg.PageCache(args.cache_dir)
+    assert cg.rebuild(args, cg.DirectorySink(tmp_path / "out"), page_cache) == (1, 0)
+    page_cache.save()
+
+    # Another output directory loads the stored page instead of rendering it.
+    args.output_dir = tmp_path / "other"
+    page_cache = cg.PageCache(args.cache_dir)
+    assert cg.rebuild(args, cg.DirectorySink(args.output_dir), page_cache) == (0, 1)
+    assert (args.output_dir / "test_month_0.svg").read_bytes() == (
+        tmp_path / "out" / "test_month_0.svg"
+    ).read_bytes()
+
+
+def test_store_keeps_the_recently_used_pages(tmp_path):
+    page_cache = cg.PageCache(tmp_path, max_size=250)
+    for index, fingerprint in enumerate(["a", "b", "c"]):
+        page_cache.store(None, fingerprint, b"x" * 100)
+        os.utime(page_cache.artifact_path(fingerprint), ns=(index, index))
+    assert page_cache.load("a") == b"x" * 100
+
+    page_cache.save()
+    assert sorted(path.stem for path in page_cache.store_dir.iterdir()) == ["a", "c"]
+
+
+def test_empty_store_size_disables_the_store(tmp_path):
+    args = cg.parse_arguments(
+        [
+            "--output-dir",
+            str(tmp_path / "out"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--months",
+            "1",
+            "--page-cache-size",
+            "0",
+        ]
+    )
+    page_cache = cg.PageCache(args.cache_dir, args.page_cache_size)
+    assert cg.rebuild(args, cg.DirectorySink(args.output_dir), page_cache) == (1, 0)
+    assert not page_cache.store_dir.exists()
+    assert str((args.output_dir / "test_month_0.svg").resolve()) in page_cache.outputs
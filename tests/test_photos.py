@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+
+import calendarCore as cg
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def prepare(tmp_path, photos, *options):
+    photo_dir = tmp_path / "photos"
+    photo_dir.mkdir(exist_ok=True)
+    for month, size in photos.items():
+        Image.new("RGB", size, (200, 80, 40)).save(photo_dir / f"{month:02d}.jpg")
+    args = cg.parse_arguments(
+        [
+            "--photos",
+            str(photo_dir),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--year",
+            "2026",
+            "--jobs",
+            "1",
+            *options,
+        ]
+    )
+    photo_texts = cg.load_photo_texts(cg.PHOTO_TEXT_PATH)
+    return cg.prepare_calendars(args, photo_texts, "")
+
+
+def test_photo_is_resized_and_embedded(tmp_path):
+    calendars = prepare(tmp_path, {12: (4000, 3000)}, "--standard", "488x330")
+    calendar = calendars[(2026, "488x330")]
+    href, frame, fingerprint = calendar["photos"][11]
+    assert calendar["photos"][:11] == (None,) * 11
+    assert cg.px_to_mm(frame[2]) >= cg.DEFAULT_PHOTO_MIN_SIZE_MM
+    assert frame[2] / frame[3] == pytest.approx(4 / 3)
+
+    cached = tmp_path / "cache" / "photos" / fingerprint
+    with Image.open(cached) as image:
+        assert image.size == cg.photo_pixels(
+            frame[2:], cg.DEFAULT_PHOTO_DPI, (4000, 3000)
+        )
+    assert href.startswith("data:image/jpeg;charset=utf-8;base64,")
+    assert href.encode("ascii") in cg.render_document(calendar, [11])
+
+
+def test_small_photo_frames_are_left_out(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        calendars = prepare(tmp_path, {1: (4000, 3000)}, "--standard", "A3")
+    assert calendars[(2026, "A3")]["photos"] == (None,) * 12
+    assert "6.7 x 5.0 mm, below the 20 mm minimum" in caplog.text
+
+    calendars = prepare(
+        tmp_path, {1: (4000, 3000)}, "--standard", "A3", "--photo-min-size", "0"
+    )
+    assert calendars[(2026, "A3")]["photos"][0] is not None
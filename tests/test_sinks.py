@@ -0,0 +1,69 @@
+import zipfile
+
+import pytest
+
+import calendarCore as cg
+
+
+def render_to_sink(sink, tmp_path, *options):
+    args = cg.parse_arguments(
+        ["--cache-dir", str(tmp_path / "cache"), "--jobs", "1", *options]
+    )
+    photo_texts = cg.load_photo_texts(cg.PHOTO_TEXT_PATH)
+    font_data = cg.load_font_data_uri(
+        cg.FONT_PATH, cg.collect_font_characters(photo_texts), args.cache_dir
+    )
+    calendars = cg.prepare_calendars(args, photo_texts, font_data)
+    tasks = cg.plan_tasks(args, calendars)
+    writer = cg.SinkWriter(sink)
+    try:
+        cg.render_calendars(tasks, calendars, 1, writer, force=True)
+    finally:
+        writer.close()
+        sink.close()
+    return {
+        output_name.as_posix(): cg.render_document(
+            calendars[calendar_key], month_indexes, backend
+        )
+        for calendar_key, month_indexes, output_name, backend in tasks
+    }
+
+
+def test_memory_sink_round_trip(tmp_path):
+    sink = cg.open_sink(*cg.sink_argument("memory"))
+    expected = render_to_sink(sink, tmp_path, "--months", "1", "2", "3")
+    assert sorted(sink.documents) == [
+        "test_month_0.svg",
+        "test_month_1.svg",
+        "test_month_2.svg",
+    ]
+    assert sink.documents == expected
+
+
+def test_memory_sink_keeps_calendar_directories(tmp_path):
+    sink = cg.open_sink("memory")
+    expected = render_to_sink(sink, tmp_path, "--months", "1", "--year", "2026", "2027")
+    assert sorted(sink.documents) == [
+        "A3_2026/test_month_0.svg",
+        "A3_2027/test_month_0.svg",
+    ]
+    assert sink.documents == expected
+
+
+def test_zip_sink_round_trip(tmp_path):
+    archive_path = tmp_path / "pages.zip"
+    sink = cg.open_sink(*cg.sink_argument(f"zip:{archive_path}"))
+    expected = render_to_sink(sink, tmp_path, "--months", "1", "2")
+    with zipfile.ZipFile(archive_path) as archive:
+        assert {name: archive.read(name) for name in archive.namelist()} == expected
+
+
+def test_sink_writer_raises_sink_errors(tmp_path):
+    class FailingSink(cg.MemorySink):
+        def write(self, name, data):
+            raise OSError("disk full")
+
+    writer = cg.SinkWriter(FailingSink())
+    writer.write("page.svg", b"<svg/>")
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
@@ -0,0 +1,54 @@
+import calendar
+import datetime
+
+import pytest
+
+import calendarCore as cg
+
+
+def test_start_day_index_matches_datetime():
+    for year in range(datetime.MINYEAR, datetime.MAXYEAR + 1):
+        assert cg.YearData.start_day_index(year) == datetime.date(year, 1, 1).weekday()
+
+
+def test_month_lengths_match_calendar():
+    for year in range(datetime.MINYEAR, datetime.MAXYEAR + 1):
+        assert cg.YearData.is_leap_year(year) == calendar.isleap(year)
+        assert cg.YearData.month_lengths(year) == [
+            calendar.monthrange(year, month)[1] for month in range(1, 13)
+        ]
+
+
+def test_month_start_matrix_matches_datetime():
+    matrix = cg.YearData.month_start_matrix(1890, 2110)
+    for year, month_starts in zip(range(1890, 2111), matrix):
+        assert month_starts == [
+            datetime.date(year, month, 1).weekday() for month in range(1, 13)
+        ]
+
+
+@pytest.mark.parametrize("year", [1600, 1900, 2000, 2024, 2025, 2026, 2027, 2100])
+def test_year_data_matches_datetime(year):
+    year_data = cg.YearData(year)
+    assert year_data.year_day_start_index == datetime.date(year, 1, 1).weekday()
+    assert year_data.month_starting_day_indexes == [
+        datetime.date(year, month, 1).weekday() for month in range(1, 13)
+    ]
+    assert year_data.month_days == [
+        calendar.monthrange(year, month)[1] for month in range(1, 13)
+    ]
+
+
+@pytest.mark.parametrize("year", [cg.MIN_YEAR - 1, cg.MAX_YEAR + 1])
+def test_years_without_neighbours_are_rejected(year):
+    with pytest.raises(ValueError, match="Year must be from"):
+        cg.get_calendar(year, cache_dir=None)
+    with pytest.raises(SystemExit):
+        cg.parse_arguments(["--year", str(year)])
+
+
+@pytest.mark.parametrize("year", [cg.MIN_YEAR, cg.MAX_YEAR])
+def test_first_and_last_years_render(year):
+    calendar = cg.get_calendar(year, cache_dir=None)
+    for month_index in (0, 11):
+        assert cg.render_document(calendar, [month_index]).startswith(b"<?xml")